@@ -0,0 +1,36 @@
+from django.contrib import admin
+
+from .models import NewsSource
+
+
+@admin.register(NewsSource)
+class NewsSourceAdmin(admin.ModelAdmin):
+    """
+    Админка источников новостей.
+
+    Статистика (articles_count, success_rate) не хранится в модели и
+    вычисляется аннотациями NewsSourceQuerySet.with_stats().
+    """
+
+    list_display = (
+        "name",
+        "source_type",
+        "is_active",
+        "priority",
+        "last_collected",
+        "articles_count",
+        "success_rate_display",
+    )
+    list_filter = ("source_type", "is_active")
+    search_fields = ("name", "url")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats()
+
+    @admin.display(description="Статей", ordering="articles_count")
+    def articles_count(self, obj):
+        return obj.articles_count
+
+    @admin.display(description="Успешность", ordering="success_rate")
+    def success_rate_display(self, obj):
+        return f"{obj.success_rate:.1f}%"
@@ -2,6 +2,8 @@
 Конфигурация приложения digest.
 """
 
+from importlib.util import find_spec
+
 from django.apps import AppConfig
 
 
@@ -15,7 +17,5 @@ class DigestConfig(AppConfig):
         Инициализация приложения.
         Здесь можно добавить сигналы или другие инициализации.
         """
-        try:
-            from . import signals
-        except ImportError:
-            pass
+        if find_spec(f"{self.name}.signals"):
+            from . import signals  # noqa: F401
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0002_alter_configuration_openai_api_key"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="generatedpost",
+            name="digest_gene_platfor_6a3bc0_idx",
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["-interest_score", "-collected_at"],
+                name="digest_arti_interes_edd717_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["content_type", "-interest_score"],
+                name="digest_arti_content_467e1c_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["source", "is_relevant"], name="digest_arti_source__c879e1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="generatedpost",
+            index=models.Index(
+                fields=["platform", "is_published", "-generated_at"],
+                name="digest_gene_platfor_e2af9d_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0003_article_generatedpost_covering_indexes"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="configuration",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("is_active",),
+                name="one_active_configuration",
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0004_configuration_one_active_configuration"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="article",
+            options={"verbose_name": "Статья", "verbose_name_plural": "Статьи"},
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0005_alter_article_options"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="newssource",
+            name="success_rate",
+        ),
+    ]
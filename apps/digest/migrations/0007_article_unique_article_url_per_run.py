@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:45
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef
+
+
+def remove_duplicate_articles(apps, schema_editor):
+    """
+    Удаляет повторы (digest_run, url), сохраненные до появления ограничения.
+
+    Из каждой группы остается статья, по которой сгенерирован пост,
+    иначе - самая ранняя.
+    """
+    Article = apps.get_model("digest", "Article")
+    GeneratedPost = apps.get_model("digest", "GeneratedPost")
+
+    duplicates = (
+        Article.objects.order_by()
+        .values("digest_run_id", "url")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        article_ids = list(
+            Article.objects.filter(
+                digest_run_id=duplicate["digest_run_id"], url=duplicate["url"]
+            )
+            .annotate(
+                has_post=Exists(GeneratedPost.objects.filter(article=OuterRef("pk")))
+            )
+            .order_by("-has_post", "pk")
+            .values_list("id", flat=True)
+        )
+        Article.objects.filter(id__in=article_ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0006_remove_newssource_success_rate"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_articles, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="article",
+            constraint=models.UniqueConstraint(
+                fields=("digest_run", "url"), name="unique_article_url_per_run"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0007_article_unique_article_url_per_run"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="digestrun",
+            index=models.Index(
+                fields=["started_at"], name="digest_dige_started_afda84_idx"
+            ),
+        ),
+    ]
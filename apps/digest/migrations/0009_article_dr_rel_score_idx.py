@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0008_digestrun_started_at_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="article",
+            name="digest_arti_digest__95f226_idx",
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["digest_run", "is_relevant", "-interest_score"],
+                name="article_dr_rel_score_idx",
+            ),
+        ),
+    ]
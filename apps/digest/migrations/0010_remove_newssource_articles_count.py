@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:47
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0009_article_dr_rel_score_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="newssource",
+            name="articles_count",
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+import re
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef
+
+# Замороженная копия DeduplicationService.normalize_url на момент миграции:
+# дальнейшие изменения сервиса не должны менять результат этой миграции.
+_URL_RE = re.compile(r"^([^:/?#]+://[^/?#]*)?([^?#]*)(?:\?([^#]*))?")
+_TRACKING_PARAMS = frozenset(
+    {
+        "utm_campaign",
+        "utm_source",
+        "utm_medium",
+        "utm_term",
+        "utm_content",
+        "fbclid",
+        "gclid",
+        "ref",
+        "source",
+        "campaign",
+    }
+)
+
+
+def _normalize_url(url):
+    prefix, path, query = _URL_RE.match(url).groups()
+    normalized = (prefix or "").lower() + path.rstrip("/")
+    if query:
+        clean_query = "&".join(
+            pair
+            for pair in query.split("&")
+            if (param := pair.partition("="))[2]
+            and param[0].lower() not in _TRACKING_PARAMS
+        )
+        if clean_query:
+            normalized += "?" + clean_query
+    return normalized
+
+
+def fill_normalized_url(apps, schema_editor):
+    Article = apps.get_model("digest", "Article")
+    batch = []
+    for article in Article.objects.only("id", "url").iterator(chunk_size=500):
+        article.normalized_url = _normalize_url(article.url)
+        batch.append(article)
+        if len(batch) >= 500:
+            Article.objects.bulk_update(batch, ["normalized_url"])
+            batch = []
+    if batch:
+        Article.objects.bulk_update(batch, ["normalized_url"])
+
+
+def remove_duplicate_articles(apps, schema_editor):
+    """
+    Удаляет статьи, совпавшие внутри прогона после нормализации URL.
+
+    Из каждой группы остается статья со сгенерированным постом (пост
+    удалился бы каскадно вместе со статьей), затем - с наибольшим
+    interest_score, при равенстве - самая ранняя.
+    """
+    Article = apps.get_model("digest", "Article")
+    GeneratedPost = apps.get_model("digest", "GeneratedPost")
+
+    duplicates = (
+        Article.objects.order_by()
+        .values("digest_run_id", "normalized_url")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        article_ids = list(
+            Article.objects.filter(
+                digest_run_id=duplicate["digest_run_id"],
+                normalized_url=duplicate["normalized_url"],
+            )
+            .annotate(
+                has_post=Exists(GeneratedPost.objects.filter(article=OuterRef("pk")))
+            )
+            .order_by("-has_post", "-interest_score", "pk")
+            .values_list("id", flat=True)
+        )
+        Article.objects.filter(id__in=article_ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("digest", "0010_remove_newssource_articles_count"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="article",
+            name="unique_article_url_per_run",
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="normalized_url",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="URL без tracking-параметров, используется для дедупликации",
+                max_length=1000,
+                verbose_name="Нормализованный URL",
+            ),
+        ),
+        migrations.RunPython(fill_normalized_url, migrations.RunPython.noop),
+        migrations.RunPython(remove_duplicate_articles, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="article",
+            constraint=models.UniqueConstraint(
+                fields=("digest_run", "normalized_url"),
+                name="unique_article_url_per_run",
+            ),
+        ),
+    ]
@@ -1,8 +1,18 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
+from django.db.models.functions import Coalesce, NullIf
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from encrypted_model_fields.fields import EncryptedCharField
 
+from .services.deduplication_service import DeduplicationService
+
+# Ключи кэша активных настроек пайплайна (сбрасываются в signals.py)
+ACTIVE_CONFIGURATION_CACHE_KEY = "digest:active_configuration"
+ACTIVE_KEYWORDS_CACHE_KEY = "digest:active_keywords"
+
+_normalize_url = DeduplicationService().normalize_url
+
 
 class DigestRun(models.Model):
     """
@@ -73,6 +83,9 @@ class DigestRun(models.Model):
         verbose_name = "Запуск дайджеста"
         verbose_name_plural = "Запуски дайджестов"
         ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["started_at"]),
+        ]
 
     def __str__(self):
         return f"Digest от {self.started_at.strftime('%Y-%m-%d %H:%M')} - {self.get_status_display()}"
@@ -90,6 +103,26 @@ class DigestRun(models.Model):
         return 0
 
 
+class NewsSourceQuerySet(models.QuerySet):
+    """
+    QuerySet источников новостей с вычисляемой статистикой.
+    """
+
+    def with_stats(self):
+        """
+        Добавляет аннотации со статистикой источника:
+        articles_count - всего собрано статей,
+        success_rate - процент статей, по которым были сгенерированы посты.
+        """
+        return self.annotate(
+            articles_count=Count("article"),
+            success_rate=Coalesce(
+                100.0 * Count("article__generated_post") / NullIf(Count("article"), 0),
+                0.0,
+            ),
+        )
+
+
 class NewsSource(models.Model):
     """
     Модель для хранения источников новостей.
@@ -131,15 +164,8 @@ class NewsSource(models.Model):
         blank=True,
         null=True,
     )
-    articles_count = models.IntegerField(
-        "Всего собрано статей",
-        default=0,
-    )
-    success_rate = models.FloatField(
-        "Процент успешных публикаций",
-        default=0,
-        help_text="Процент статей из этого источника, которые были опубликованы",
-    )
+
+    objects = NewsSourceQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Источник новостей"
@@ -186,6 +212,14 @@ class Article(models.Model):
         "URL статьи",
         max_length=1000,
     )
+    normalized_url = models.CharField(
+        "Нормализованный URL",
+        max_length=1000,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="URL без tracking-параметров, используется для дедупликации",
+    )
     summary = models.TextField(
         "Краткое содержание",
         blank=True,
@@ -224,16 +258,72 @@ class Article(models.Model):
     class Meta:
         verbose_name = "Статья"
         verbose_name_plural = "Статьи"
-        ordering = ["-interest_score", "-collected_at"]
         indexes = [
-            models.Index(fields=["digest_run", "is_relevant"]),
+            models.Index(
+                fields=["digest_run", "is_relevant", "-interest_score"],
+                name="article_dr_rel_score_idx",
+            ),
             models.Index(fields=["interest_score"]),
             models.Index(fields=["collected_at"]),
+            models.Index(fields=["-interest_score", "-collected_at"]),
+            models.Index(fields=["content_type", "-interest_score"]),
+            models.Index(fields=["source", "is_relevant"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["digest_run", "normalized_url"],
+                name="unique_article_url_per_run",
+            ),
         ]
 
     def __str__(self):
         return f"{self.title[:50]}... ({self.interest_score}/10)"
 
+    def save(self, *args, **kwargs):
+        self.normalized_url = _normalize_url(self.url)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def bulk_ingest(cls, digest_run, articles, batch_size=500):
+        """
+        Сохраняет статьи запуска пачками вместо INSERT на каждую статью.
+
+        Повторы нормализованного URL внутри пачки и статьи, уже сохраненные
+        в этом запуске, отбрасываются до вставки. Поэтому вставка идет без
+        ignore_conflicts, и у созданных объектов заполняется первичный ключ.
+        Размер пачки дополнительно ограничивается Django по лимиту параметров
+        запроса (999 для SQLite).
+
+        Args:
+            digest_run: Запуск дайджеста, к которому относятся статьи
+            articles: Несохраненные объекты Article
+            batch_size: Максимальное количество строк в одном INSERT
+
+        Returns:
+            List[Article]: Созданные статьи
+        """
+        unique_articles = {}
+        for article in articles:
+            article.digest_run = digest_run
+            article.normalized_url = _normalize_url(article.url)
+            unique_articles.setdefault(article.normalized_url, article)
+
+        with transaction.atomic():
+            existing_urls = set(
+                cls.objects.filter(
+                    digest_run=digest_run,
+                    normalized_url__in=list(unique_articles),
+                ).values_list("normalized_url", flat=True)
+            )
+            return cls.objects.bulk_create(
+                [
+                    article
+                    for normalized_url, article in unique_articles.items()
+                    if normalized_url not in existing_urls
+                ],
+                batch_size=batch_size,
+            )
+
 
 class GeneratedPost(models.Model):
     """
@@ -293,7 +383,7 @@ class GeneratedPost(models.Model):
         verbose_name_plural = "Сгенерированные посты"
         ordering = ["-generated_at"]
         indexes = [
-            models.Index(fields=["platform", "is_published"]),
+            models.Index(fields=["platform", "is_published", "-generated_at"]),
             models.Index(fields=["generated_at"]),
         ]
 
@@ -394,6 +484,13 @@ class Configuration(models.Model):
         verbose_name = "Конфигурация"
         verbose_name_plural = "Конфигурации"
         ordering = ["-is_active", "name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["is_active"],
+                condition=models.Q(is_active=True),
+                name="one_active_configuration",
+            ),
+        ]
 
     def __str__(self):
         status = "✅ Активная" if self.is_active else "❌ Неактивная"
@@ -403,10 +500,23 @@ class Configuration(models.Model):
         """
         Гарантирует, что только одна конфигурация активна.
         """
-        if self.is_active:
-            # Деактивируем все другие конфигурации
-            Configuration.objects.filter(is_active=True).update(is_active=False)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self.is_active and not self._was_active():
+                # Деактивируем все другие конфигурации
+                Configuration.objects.filter(is_active=True).exclude(pk=self.pk).update(
+                    is_active=False
+                )
+            super().save(*args, **kwargs)
+
+    def _was_active(self) -> bool:
+        """Была ли конфигурация активной до текущего сохранения."""
+        if self._state.adding or self.pk is None:
+            return False
+        return bool(
+            Configuration.objects.filter(pk=self.pk)
+            .values_list("is_active", flat=True)
+            .first()
+        )
 
 
 class Keyword(models.Model):
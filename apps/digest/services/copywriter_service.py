@@ -1,10 +1,62 @@
-import requests
-from typing import Dict
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from django.conf import settings
 
 from logger.logger import setup_logger
 
+from .http_session import FLOWISE_REQUEST_TIMEOUT, flowise_session
+
+try:
+    # orjson - необязательная зависимость с быстрым C-парсером JSON
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = setup_logger(module_name=__name__)
 
+# Количество одновременных запросов к Flowise при создании постов
+COPYWRITER_MAX_WORKERS = settings.FLOWISE_COPYWRITER_MAX_WORKERS
+
+# Структурированный ответ копирайтера: секции "post:" и "image_idea:"
+_COPYWRITER_RESPONSE_RE = re.compile(
+    r"^\s*post:\s*(?P<post>.*?)^\s*image_idea:(?P<image_idea>.*)",
+    re.DOTALL | re.MULTILINE,
+)
+
+
+def _parse_copywriter_response(text: str) -> Optional[Dict[str, str]]:
+    """
+    Разбирает ответ копирайтера: сначала как JSON, затем как текст
+    с секциями "post:" и "image_idea:".
+
+    Args:
+        text: Текст ответа Flowise
+
+    Returns:
+        Dict или None: {"post": ..., "image_idea": ...} или None, если
+        ответ не в ожидаемом формате
+    """
+    if text.startswith("{"):
+        try:
+            data = _json_loads(text)
+            return {
+                "post": str(data["post"]).strip(),
+                "image_idea": str(data["image_idea"]).strip(),
+            }
+        except (ValueError, KeyError, TypeError):
+            logger.debug("Ответ копирайтера не является ожидаемым JSON")
+
+    match = _COPYWRITER_RESPONSE_RE.search(text)
+    if match:
+        return {
+            "post": match["post"].strip(),
+            "image_idea": " ".join(match["image_idea"].split()),
+        }
+    return None
+
 
 class CopywriterService:
     def __init__(self):
@@ -35,37 +87,18 @@ class CopywriterService:
         }
 
         try:
-            response = requests.post(url, json=payload)
+            response = flowise_session.post(
+                url, json=payload, timeout=FLOWISE_REQUEST_TIMEOUT
+            )
             response.raise_for_status()
 
-            result_text = response.json().get("text", "").strip()
+            result_text = _json_loads(response.content).get("text", "").strip()
 
             # Пытаемся парсить структурированный ответ
             try:
-                # Ищем JSON в ответе
-                if "post:" in result_text and "image_idea:" in result_text:
-                    lines = result_text.split("\n")
-                    post_content = ""
-                    image_idea = ""
-                    current_section = None
-
-                    for line in lines:
-                        line = line.strip()
-                        if line.startswith("post:"):
-                            current_section = "post"
-                            post_content = line.replace("post:", "").strip()
-                        elif line.startswith("image_idea:"):
-                            current_section = "image_idea"
-                            image_idea = line.replace("image_idea:", "").strip()
-                        elif current_section == "post" and line:
-                            post_content += "\n" + line
-                        elif current_section == "image_idea" and line:
-                            image_idea += " " + line
-
-                    return {
-                        "post": post_content.strip(),
-                        "image_idea": image_idea.strip(),
-                    }
+                parsed = _parse_copywriter_response(result_text)
+                if parsed:
+                    return parsed
 
                 logger.warning(result_text)
                 # Если структуры нет, возвращаем весь текст как пост
@@ -85,3 +118,36 @@ class CopywriterService:
                 "post": f"Ошибка создания поста для: {article['title']}",
                 "image_idea": "Ошибка",
             }
+
+    def call_flowise_copywriter_batch(
+        self,
+        flow_id: str,
+        articles: List[Dict[str, str]],
+        flowise_host: str,
+        max_workers: int = COPYWRITER_MAX_WORKERS,
+    ) -> List[Dict[str, str]]:
+        """
+        Создает посты для нескольких статей параллельными запросами к Flowise.
+
+        Args:
+            flow_id: ID Flowise потока для копирайтинга
+            articles: Список статей (title, summary, url)
+            flowise_host: Хост Flowise API
+            max_workers: Максимальное количество одновременных запросов
+
+        Returns:
+            List[Dict]: Результаты копирайтера в порядке исходных статей
+        """
+        if not articles:
+            return []
+
+        workers = max(1, min(max_workers, len(articles)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    lambda article: self.call_flowise_copywriter(
+                        flow_id, article, flowise_host
+                    ),
+                    articles,
+                )
+            )
@@ -1,11 +1,14 @@
-from typing import List, Dict, Set
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import re
+from typing import ClassVar, Dict, FrozenSet, List, Set, Tuple
 from difflib import SequenceMatcher
 
 from logger.logger import setup_logger
 
 logger = setup_logger(module_name=__name__)
 
+# scheme://netloc, путь и query; fragment отбрасывается
+_URL_RE = re.compile(r"^([^:/?#]+://[^/?#]*)?([^?#]*)(?:\?([^#]*))?")
+
 
 class DeduplicationService:
     """
@@ -15,6 +18,22 @@ class DeduplicationService:
     для предотвращения повторов в финальном дайджесте.
     """
 
+    # Query-параметры, которые не влияют на содержимое страницы
+    TRACKING_PARAMS: ClassVar[FrozenSet[str]] = frozenset(
+        {
+            "utm_campaign",
+            "utm_source",
+            "utm_medium",
+            "utm_term",
+            "utm_content",
+            "fbclid",
+            "gclid",
+            "ref",
+            "source",
+            "campaign",
+        }
+    )
+
     def normalize_url(self, url: str) -> str:
         """
         Нормализует URL для сравнения, удаляя UTM-параметры и другие tracking данные.
@@ -25,49 +44,21 @@ class DeduplicationService:
         Returns:
             str: Нормализованный URL
         """
-        try:
-            parsed = urlparse(url)
-
-            # Удаляем tracking параметры
-            query_params = parse_qs(parsed.query)
-            tracking_params = {
-                "utm_campaign",
-                "utm_source",
-                "utm_medium",
-                "utm_term",
-                "utm_content",
-                "fbclid",
-                "gclid",
-                "ref",
-                "source",
-                "campaign",
-            }
-
-            # Оставляем только не-tracking параметры
-            clean_params = {
-                k: v
-                for k, v in query_params.items()
-                if k.lower() not in tracking_params
-            }
-
-            # Восстанавливаем URL без tracking параметров
-            clean_query = urlencode(clean_params, doseq=True)
-            normalized = urlunparse(
-                (
-                    parsed.scheme.lower(),
-                    parsed.netloc.lower(),
-                    parsed.path.rstrip("/"),
-                    parsed.params,
-                    clean_query,
-                    "",  # убираем fragment
-                )
+        prefix, path, query = _URL_RE.match(url).groups()
+        normalized = (prefix or "").lower() + path.rstrip("/")
+
+        # Оставляем только не-tracking параметры с непустым значением
+        if query:
+            clean_query = "&".join(
+                pair
+                for pair in query.split("&")
+                if (param := pair.partition("="))[2]
+                and param[0].lower() not in self.TRACKING_PARAMS
             )
+            if clean_query:
+                normalized += "?" + clean_query
 
-            return normalized
-
-        except Exception as e:
-            logger.debug(f"Ошибка нормализации URL {url}: {e}")
-            return url.lower().strip()
+        return normalized
 
     def calculate_content_similarity(self, text1: str, text2: str) -> float:
         """
@@ -89,6 +80,38 @@ class DeduplicationService:
 
         return SequenceMatcher(None, normalized1, normalized2).ratio()
 
+    @staticmethod
+    def _ratio_if_above(matcher: SequenceMatcher, text: str, threshold: float) -> float:
+        """
+        Сравнивает нормализованный текст со второй последовательностью matcher.
+
+        SequenceMatcher кэширует разбор второй последовательности, поэтому
+        один matcher на уже принятую статью переиспользуется для всех
+        последующих кандидатов.
+
+        Args:
+            matcher: SequenceMatcher с нормализованным текстом принятой статьи
+            text: Нормализованный текст кандидата
+            threshold: Порог сходства (0-1)
+
+        Returns:
+            float: Коэффициент сходства или 0.0, если он ниже порога
+        """
+        if not text or not matcher.b:
+            return 0.0
+
+        # Оценка по длинам (то же, что real_quick_ratio()) без вызова matcher
+        len_text, len_existing = len(text), len(matcher.b)
+        if 2 * min(len_text, len_existing) < threshold * (len_text + len_existing):
+            return 0.0
+
+        matcher.set_seq1(text)
+        if matcher.quick_ratio() < threshold:
+            return 0.0
+
+        similarity = matcher.ratio()
+        return similarity if similarity >= threshold else 0.0
+
     def find_duplicates(
         self,
         articles: List[Dict[str, str]],
@@ -111,12 +134,16 @@ class DeduplicationService:
 
         seen_urls: Set[str] = set()
         unique_articles: List[Dict[str, str]] = []
+        # Matcher'ы заголовка и содержания для каждой принятой статьи
+        unique_matchers: List[Tuple[SequenceMatcher, SequenceMatcher]] = []
+        seen_titles: Set[str] = set()
         duplicates_found = 0
 
         for article in articles:
             url = article.get("url", "")
             title = article.get("title", "")
-            summary = article.get("summary", "")
+            normalized_title = (title or "").lower().strip()
+            normalized_summary = (article.get("summary") or "").lower().strip()
 
             # Нормализуем URL для проверки
             normalized_url = self.normalize_url(url)
@@ -124,29 +151,33 @@ class DeduplicationService:
             # Проверяем дубликаты по URL
             if normalized_url in seen_urls:
                 duplicates_found += 1
-                logger.debug(f"Дубликат по URL найден: {title[:50]}... ({url})")
+                logger.debug("Дубликат по URL найден: {:.50}... ({})", title, url)
+                continue
+
+            # Совпадающий заголовок - дубликат без посимвольного сравнения
+            if check_content and normalized_title in seen_titles:
+                duplicates_found += 1
+                logger.debug("Дубликат по заголовку найден: {:.50}...", title)
                 continue
 
             # Проверяем сходство содержания с уже добавленными статьями
             is_duplicate = False
-            if check_content and unique_articles:
-                for existing_article in unique_articles:
-                    # Сравниваем заголовки
-                    title_similarity = self.calculate_content_similarity(
-                        title, existing_article.get("title", "")
-                    )
-
-                    # Сравниваем содержание
-                    content_similarity = self.calculate_content_similarity(
-                        summary, existing_article.get("summary", "")
+            if check_content and unique_matchers:
+                for title_matcher, summary_matcher in unique_matchers:
+                    # Сравниваем заголовки, затем содержание
+                    max_similarity = self._ratio_if_above(
+                        title_matcher, normalized_title, similarity_threshold
+                    ) or self._ratio_if_above(
+                        summary_matcher, normalized_summary, similarity_threshold
                     )
 
                     # Если заголовок или содержание очень похожи - это дубликат
-                    max_similarity = max(title_similarity, content_similarity)
-                    if max_similarity >= similarity_threshold:
+                    if max_similarity:
                         duplicates_found += 1
                         logger.debug(
-                            f"Дубликат по содержанию найден (сходство {max_similarity:.2f}): {title[:50]}..."
+                            "Дубликат по содержанию найден (сходство {:.2f}): {:.50}...",
+                            max_similarity,
+                            title,
                         )
                         is_duplicate = True
                         break
@@ -154,6 +185,15 @@ class DeduplicationService:
             if not is_duplicate:
                 seen_urls.add(normalized_url)
                 unique_articles.append(article)
+                if check_content:
+                    if normalized_title:
+                        seen_titles.add(normalized_title)
+                    unique_matchers.append(
+                        (
+                            SequenceMatcher(None, "", normalized_title),
+                            SequenceMatcher(None, "", normalized_summary),
+                        )
+                    )
 
         logger.info(
             f"🔍 Дедупликация: удалено {duplicates_found} дубликатов из {len(articles)} статей"
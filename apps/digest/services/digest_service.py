@@ -18,7 +18,7 @@ from pathlib import Path
 from .scout_service import ScoutService
 from .filter_service import FilterService
 from .copywriter_service import CopywriterService
-from .image_generation_service import generate_image_for_post
+from .image_generation_service import generate_images_for_posts
 from .deduplication_service import DeduplicationService
 from .integration_service import IntegrationService
 
@@ -55,9 +55,9 @@ class DigestService:
             f.write(f"## Digest от {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
 
             for idx, article in enumerate(articles, 1):
-                logger.debug(f"Сохраняем статью в markdown: {article.keys()}")
+                logger.debug("Сохраняем статью в markdown: {}", article.keys())
                 logger.debug(
-                    f"post_content длина: {len(article.get('post_content', ''))}"
+                    "post_content длина: {}", len(article.get("post_content", ""))
                 )
 
                 f.write(f"### {idx}. {article['title']}\n\n")
@@ -159,12 +159,17 @@ class NewsPipeline:
 
         return unique_articles
 
-    def run_filter_stage(self, articles: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    def run_filter_stage(
+        self,
+        articles: List[Dict[str, str]],
+        relevance_checks: Optional[List[Dict]] = None,
+    ) -> List[Dict[str, str]]:
         """
         Этап 2: Фильтрация релевантных новостей через Filter агента.
 
         Args:
             articles: Статьи от Scout агента
+            relevance_checks: Уже полученные результаты фильтра для этих статей
 
         Returns:
             List[Dict]: Отфильтрованные статьи
@@ -179,6 +184,7 @@ class NewsPipeline:
             articles=articles,
             flow_id=self.flowise_filter_id,
             flowise_host=self.flowise_host,
+            relevance_checks=relevance_checks,
         )
 
         logger.info(
@@ -212,36 +218,29 @@ class NewsPipeline:
                 f"📊 Выбираем ТОП-{max_posts} самых интересных статей из {len(articles)} отфильтрованных"
             )
 
+        copywriter_results = copywriter_service.call_flowise_copywriter_batch(
+            flow_id=self.flowise_copywriter_id,
+            articles=articles_to_process,
+            flowise_host=self.flowise_host,
+        )
+
         articles_with_posts = []
 
-        for idx, article in enumerate(articles_to_process, 1):
-            interest_score = article.get("interest_score", 0)
-            logger.debug(
-                f"Создаем пост для статьи {idx}/{len(articles_to_process)} (оценка {interest_score}/10): {article['title'][:50]}..."
+        for article, copywriter_result in zip(articles_to_process, copywriter_results):
+            # Добавляем созданный пост и идею изображения к статье
+            articles_with_posts.append(
+                article
+                | {
+                    "post_content": copywriter_result["post"],
+                    "image_idea": copywriter_result["image_idea"],
+                }
             )
 
-            try:
-                copywriter_result = copywriter_service.call_flowise_copywriter(
-                    flow_id=self.flowise_copywriter_id,
-                    article=article,
-                    flowise_host=self.flowise_host,
-                )
-
-                # Добавляем созданный пост и идею изображения к статье
-                article_with_post = article.copy()
-                article_with_post["post_content"] = copywriter_result["post"]
-                article_with_post["image_idea"] = copywriter_result["image_idea"]
-                articles_with_posts.append(article_with_post)
-
-                logger.debug(
-                    f"✅ Пост создан для: {article['title'][:50]}... (рейтинг {interest_score}/10)"
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"❌ Ошибка создания поста для {article['title'][:50]}...: {e}"
-                )
-                continue
+            logger.debug(
+                "✅ Пост создан для: {:.50}... (рейтинг {}/10)",
+                article["title"],
+                article.get("interest_score", 0),
+            )
 
         logger.info(
             f"✅ Copywriter: создано {len(articles_with_posts)} постов из {len(articles_to_process)} ТОП статей (всего отфильтровано: {len(articles)})"
@@ -276,39 +275,30 @@ class NewsPipeline:
             logger.error("❌ Не указан OpenAI API key для генерации изображений")
             return articles
 
-        articles_with_images = []
-
-        for idx, article in enumerate(articles, 1):
-            logger.debug(
-                f"Генерируем изображение для статьи {idx}/{len(articles)}: {article['title'][:50]}..."
+        logger.debug(f"Генерируем изображения для {len(articles)} статей")
+        try:
+            # Генерируем изображения используя идеи от копирайтера
+            image_paths = generate_images_for_posts(
+                image_ideas=[article["image_idea"] for article in articles],
+                api_key=openai_api_key,
+                **self.image_config,
             )
+        except Exception as e:
+            logger.error(f"❌ Ошибка генерации изображений: {e}")
+            image_paths = [None] * len(articles)
 
-            try:
-                # Генерируем изображение используя идею от копирайтера
-                image_path = generate_image_for_post(
-                    image_idea=article["image_idea"],
-                    api_key=openai_api_key,
-                    **self.image_config,
-                )
-
-                # Добавляем путь к изображению
-                article_with_image = article.copy()
-                article_with_image["image_path"] = image_path
-                articles_with_images.append(article_with_image)
+        articles_with_images = []
 
-                if image_path:
-                    logger.debug(f"✅ Изображение создано: {image_path}")
-                else:
-                    logger.debug("❌ Не удалось создать изображение")
+        for article, image_path in zip(articles, image_paths):
+            # Добавляем путь к изображению
+            articles_with_images.append(article | {"image_path": image_path})
 
-            except Exception as e:
-                logger.error(
-                    f"❌ Ошибка генерации изображения для {article['title'][:50]}...: {e}"
+            if image_path:
+                logger.debug("✅ Изображение создано: {}", image_path)
+            else:
+                logger.debug(
+                    "❌ Не удалось создать изображение для {:.50}...", article["title"]
                 )
-                # Добавляем статью без изображения
-                article_copy = article.copy()
-                article_copy["image_path"] = None
-                articles_with_images.append(article_copy)
 
         successful_images = len(
             [a for a in articles_with_images if a.get("image_path")]
@@ -582,8 +572,12 @@ def run_news_pipeline_with_tracking(
         all_news, pipeline.flowise_filter_id, pipeline.flowise_host
     )
 
-    # Этап 2: Filter - фильтрация релевантных
-    filtered_news = pipeline.run_filter_stage(all_news)
+    # Этап 2: Filter - фильтрация релевантных (используем уже полученные
+    # результаты, чтобы не проверять каждую статью через Flowise дважды)
+    filtered_news = pipeline.run_filter_stage(
+        all_news,
+        relevance_checks=[article["filter_result"] for article in all_news_with_filter],
+    )
 
     if not filtered_news:
         logger.warning("⚠️ Pipeline остановлен: Filter не пропустил ни одной статьи")
@@ -1,10 +1,11 @@
+import atexit
+import base64
+import re
 import smtplib
 from pathlib import Path
 from typing import List, Dict, Optional
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
+from email import policy
+from email.message import EmailMessage, MIMEPart
 from datetime import datetime
 
 from config import settings
@@ -12,26 +13,22 @@ from logger.logger import setup_logger
 
 logger = setup_logger(module_name=__name__)
 
+# Размер блока чтения вложений: кратен 57 байтам, чтобы каждый блок
+# кодировался в целые 76-символьные строки base64 (RFC 2045)
+_ATTACHMENT_CHUNK_SIZE = 57 * 1024
 
-class EmailService:
-    """
-    Модуль для отправки email уведомлений с результатами SMM pipeline.
-    """
+# Упрощенная проверка адреса: одна "@" и точка в домене, без пробелов
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
-    def create_email_content(
-        self, posts: List[Dict[str, str]], total_count: int
-    ) -> str:
-        """
-        Создает HTML-содержимое письма с результатами pipeline.
+# Экранирование пользовательских данных в HTML за один проход по строке;
+# в описании поста переводы строк дополнительно заменяются на <br>
+_HTML_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+_HTML_ESCAPE_NL_TABLE = _HTML_ESCAPE_TABLE | {ord("\n"): "<br>"}
 
-        Args:
-            posts: Список созданных постов
-            total_count: Общее количество постов
-
-        Returns:
-            str: HTML-содержимое письма
-        """
-        html_content = f"""
+# HTML-шаблоны письма: собираются один раз при импорте модуля
+_EMAIL_HEADER_TEMPLATE = """
         <!DOCTYPE html>
         <html>
         <head>
@@ -53,7 +50,7 @@ class EmailService:
             <div class="header">
                 <h1>🐍 Python Digest - Еженедельный дайджест</h1>
                 <p>Лучшее из мира Python-разработки за неделю</p>
-                <p>Сгенерировано: {datetime.now().strftime("%d.%m.%Y в %H:%M")}</p>
+                <p>Сгенерировано: {generated_at}</p>
             </div>
 
             <div class="stats">
@@ -62,47 +59,39 @@ class EmailService:
                     <li><strong>Всего материалов отобрано:</strong> {total_count}</li>
                     <li><strong>Период сбора:</strong> последние 7 дней</li>
                     <li><strong>Источники:</strong> Python-сообщества, блоги, новостные ленты</li>
-                    <li><strong>Постов с изображениями:</strong> {len([p for p in posts if p.get("image_path")])}</li>
+                    <li><strong>Постов с изображениями:</strong> {image_count}</li>
                 </ul>
             </div>
         """
 
-        if posts:
-            html_content += "<h2>🐍 Python-материалы этой недели (сортировка по релевантности):</h2>"
+_EMAIL_POSTS_TITLE_HTML = (
+    "<h2>🐍 Python-материалы этой недели (сортировка по релевантности):</h2>"
+)
 
-            for idx, post in enumerate(posts, 1):
-                # Получаем данные поста согласно ТЗ
-                title = post.get("title", "Без названия")[:100]  # Максимум 100 символов
-                post_type = post.get(
-                    "content_type", "Материал"
-                )  # Тип: статья, новость, видео и т.д.
-                description = post.get("description", post.get("post_content", ""))[
-                    :350
-                ]  # Максимум 350 символов
-                url = post.get("url", "#")
-
-                html_content += f"""
+_EMAIL_POST_TEMPLATE = """
                 <div class="post">
                     <div class="post-title">{idx}. {title}</div>
                     <div class="post-type">Тип материала: {post_type}</div>
                     <div class="post-content">
-                        {description.replace(chr(10), "<br>")}
+                        {description}
                     </div>
                     <p style="margin-top: 15px;">
                         <strong>🔗 Ссылка:</strong> <a href="{url}" class="post-url">{url}</a>
                     </p>
-                    {f"<p><strong>🖼️ Изображение:</strong> {Path(post['image_path']).name}</p>" if post.get("image_path") else ""}
+                    {image_html}
                 </div>
                 """
-        else:
-            html_content += """
+
+_EMAIL_POST_IMAGE_TEMPLATE = "<p><strong>🖼️ Изображение:</strong> {image_name}</p>"
+
+_EMAIL_NO_POSTS_HTML = """
             <div class="post">
                 <p>😔 На этой неделе не найдено интересных Python-материалов.</p>
                 <p>💡 Возможно, стоит расширить источники или изменить критерии отбора.</p>
             </div>
             """
 
-        html_content += """
+_EMAIL_FOOTER_HTML = """
             <div class="footer">
                 <p><span class="python-accent">Автоматически сгенерировано Python Digest Pipeline</span></p>
                 <p>🐍🤖 Powered by Python & AI</p>
@@ -114,7 +103,165 @@ class EmailService:
         </html>
         """
 
-        return html_content
+
+class EmailService:
+    """
+    Модуль для отправки email уведомлений с результатами SMM pipeline.
+    """
+
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+        # Соединение кэшируется между отправками, поэтому закрываем его
+        # при завершении процесса, даже если close() не был вызван явно
+        atexit.register(self.close)
+
+    def __enter__(self) -> "EmailService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_smtp(self) -> smtplib.SMTP:
+        """
+        Возвращает авторизованное SMTP-соединение, переиспользуя открытое.
+
+        Returns:
+            smtplib.SMTP: Готовое к отправке соединение
+        """
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+
+        logger.info(
+            f"📧 Подключение к SMTP серверу: {settings.smtp_server}:{settings.smtp_port}"
+        )
+        if settings.smtp_port == 465:
+            server = smtplib.SMTP_SSL(
+                settings.smtp_server, settings.smtp_port, timeout=30
+            )
+        else:
+            server = smtplib.SMTP(settings.smtp_server, settings.smtp_port, timeout=30)
+
+        try:
+            if settings.smtp_use_tls and settings.smtp_port != 465:
+                logger.debug("📧 Включаем TLS...")
+                server.starttls()
+
+            if settings.smtp_username and settings.smtp_password:
+                logger.debug("📧 Авторизация...")
+                server.login(settings.smtp_username, settings.smtp_password)
+        except Exception:
+            server.close()
+            raise
+
+        self._smtp = server
+        return server
+
+    def close(self) -> None:
+        """Закрывает открытое SMTP-соединение."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def create_email_content(
+        self,
+        posts: List[Dict[str, str]],
+        total_count: int,
+        generated_at: Optional[datetime] = None,
+    ) -> str:
+        """
+        Создает HTML-содержимое письма с результатами pipeline.
+
+        Args:
+            posts: Список созданных постов
+            total_count: Общее количество постов
+            generated_at: Время формирования письма (по умолчанию - текущее)
+
+        Returns:
+            str: HTML-содержимое письма
+        """
+        # Заголовок зависит от числа постов с изображениями, поэтому
+        # подставляется после прохода по постам
+        parts = [""]
+        image_count = 0
+
+        if posts:
+            parts.append(_EMAIL_POSTS_TITLE_HTML)
+
+            for idx, post in enumerate(posts, 1):
+                # Получаем данные поста согласно ТЗ. Значения приводятся к str:
+                # в посте могут оказаться None или не-строки.
+                # Заголовок - максимум 100 символов
+                title = str(post.get("title") or "Без названия")[:100]
+                # Тип: статья, новость, видео и т.д.
+                post_type = str(post.get("content_type") or "Материал")
+                # Описание - максимум 350 символов
+                description = str(
+                    post.get("description") or post.get("post_content") or ""
+                )[:350]
+                url = str(post.get("url") or "#")
+                image_html = ""
+                if post.get("image_path"):
+                    image_count += 1
+                    image_html = _EMAIL_POST_IMAGE_TEMPLATE.format(
+                        image_name=Path(post["image_path"]).name.translate(
+                            _HTML_ESCAPE_TABLE
+                        )
+                    )
+
+                parts.append(
+                    _EMAIL_POST_TEMPLATE.format(
+                        idx=idx,
+                        title=title.translate(_HTML_ESCAPE_TABLE),
+                        post_type=post_type.translate(_HTML_ESCAPE_TABLE),
+                        description=description.translate(_HTML_ESCAPE_NL_TABLE),
+                        url=url.translate(_HTML_ESCAPE_TABLE),
+                        image_html=image_html,
+                    )
+                )
+        else:
+            parts.append(_EMAIL_NO_POSTS_HTML)
+
+        parts.append(_EMAIL_FOOTER_HTML)
+        parts[0] = _EMAIL_HEADER_TEMPLATE.format(
+            generated_at=(generated_at or datetime.now()).strftime("%d.%m.%Y в %H:%M"),
+            total_count=total_count,
+            image_count=image_count,
+        )
+
+        return "".join(parts)
+
+    @staticmethod
+    def _create_attachment(path: Path) -> MIMEPart:
+        """
+        Создает MIME-вложение из файла, кодируя его в base64 по частям.
+
+        Args:
+            path: Путь к прикрепляемому файлу
+
+        Returns:
+            MIMEPart: Готовая часть письма
+        """
+        with open(path, "rb") as attachment:
+            encoded = b"".join(
+                base64.encodebytes(chunk)
+                for chunk in iter(lambda: attachment.read(_ATTACHMENT_CHUNK_SIZE), b"")
+            )
+
+        part = MIMEPart(policy=policy.SMTP)
+        part["Content-Type"] = "application/octet-stream"
+        part["Content-Transfer-Encoding"] = "base64"
+        part.add_header("Content-Disposition", "attachment", filename=path.name)
+        part.set_payload(encoded.decode("ascii"))
+        return part
 
     def send_email_notification(
         self,
@@ -147,77 +294,47 @@ class EmailService:
             logger.info("📧 Подготовка email уведомления...")
 
             # Создаем сообщение
-            msg = MIMEMultipart("alternative")
+            msg = EmailMessage(policy=policy.SMTP)
             msg["From"] = settings.email_from or settings.smtp_username
             msg["To"] = ", ".join(settings.email_recipients)
+            # Одно время для темы и тела письма
+            now = datetime.now()
             msg["Subject"] = (
-                f"{settings.email_subject} ({datetime.now().strftime('%d.%m.%Y %H:%M')})"
+                f"{settings.email_subject} ({now.strftime('%d.%m.%Y %H:%M')})"
             )
 
             # Создаем HTML содержимое
-            html_content = self.create_email_content(posts, len(posts))
-            html_part = MIMEText(html_content, "html", "utf-8")
-            msg.attach(html_part)
+            html_content = self.create_email_content(
+                posts, len(posts), generated_at=now
+            )
+            msg.set_content(html_content, subtype="html", cte="base64")
 
             # Прикрепляем файлы если они есть
-            attachments_added = 0
-
-            if markdown_file and markdown_file.exists():
-                with open(markdown_file, "rb") as attachment:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        "Content-Disposition",
-                        f"attachment; filename= {markdown_file.name}",
-                    )
-                    msg.attach(part)
-                    attachments_added += 1
-
-            if summary_file and summary_file.exists():
-                with open(summary_file, "rb") as attachment:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        "Content-Disposition",
-                        f"attachment; filename= {summary_file.name}",
-                    )
-                    msg.attach(part)
-                    attachments_added += 1
-
-            if comprehensive_report and comprehensive_report.exists():
-                with open(comprehensive_report, "rb") as attachment:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        "Content-Disposition",
-                        f"attachment; filename= {comprehensive_report.name}",
-                    )
-                    msg.attach(part)
-                    attachments_added += 1
+            attachments = [
+                path
+                for path in (markdown_file, summary_file, comprehensive_report)
+                if path and path.exists()
+            ]
+            if attachments:
+                # Вложения уже закодированы в base64 по частям, поэтому
+                # добавляются готовыми частями, а не через add_attachment()
+                msg.make_mixed()
+                for path in attachments:
+                    msg.attach(self._create_attachment(path))
+            attachments_added = len(attachments)
 
             # Подключаемся к SMTP серверу и отправляем
-            logger.info(
-                f"📧 Подключение к SMTP серверу: {settings.smtp_server}:{settings.smtp_port}"
-            )
-
             try:
-                with smtplib.SMTP(
-                    settings.smtp_server, settings.smtp_port, timeout=30
-                ) as server:
-                    if settings.smtp_use_tls:
-                        logger.debug("📧 Включаем TLS...")
-                        server.starttls()
-
-                    if settings.smtp_username and settings.smtp_password:
-                        logger.debug("📧 Авторизация...")
-                        server.login(settings.smtp_username, settings.smtp_password)
-
-                    text = msg.as_string()
-                    logger.debug("📧 Отправляем письмо...")
-                    server.sendmail(msg["From"], settings.email_recipients, text)
+                server = self._get_smtp()
+                logger.debug("📧 Отправляем письмо...")
+                try:
+                    server.send_message(
+                        msg, msg["From"], list(settings.email_recipients)
+                    )
+                except Exception:
+                    # Соединение могло оборваться - при следующей отправке подключимся заново
+                    self.close()
+                    raise
 
             except smtplib.SMTPConnectError as e:
                 logger.error(f"📧 Ошибка подключения к SMTP серверу: {e}")
@@ -278,10 +395,9 @@ class EmailService:
             return False
 
         # Проверяем email адреса
-        invalid_emails = []
-        for email in settings.email_recipients:
-            if "@" not in email or "." not in email:
-                invalid_emails.append(email)
+        invalid_emails = [
+            email for email in settings.email_recipients if not _EMAIL_RE.match(email)
+        ]
 
         if invalid_emails:
             logger.error(f"❌ Некорректные email адреса: {', '.join(invalid_emails)}")
@@ -1,18 +1,195 @@
-import requests
-from typing import List, Dict
+import hashlib
+import heapq
+import json
+import operator
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
 
 from logger.logger import setup_logger
 
+from .http_session import FLOWISE_REQUEST_TIMEOUT, flowise_session
+
+try:
+    # orjson - необязательная зависимость с быстрым C-парсером JSON
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = setup_logger(module_name=__name__)
 
+# Количество одновременных запросов к Flowise при фильтрации
+FLOWISE_MAX_WORKERS = settings.FLOWISE_FILTER_MAX_WORKERS
+
+# Время жизни закешированного ответа фильтра (24 часа)
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+# Значения по умолчанию для полей ответа фильтра
+_RELEVANCE_DEFAULTS = {
+    "is_relevant": False,
+    "relevance_reason": "Нет объяснения",
+    "interest_score": 0,
+    "interest_reason": "Нет объяснения",
+    "content_type": "Неизвестно",
+    "summary": "",
+    "title_ru": "",
+    "url": "",
+}
+
+# Ключ сортировки отфильтрованных статей: поле всегда заполнено из
+# результата проверки (см. _RELEVANCE_DEFAULTS)
+_interest_score = operator.itemgetter("interest_score")
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """
+    Извлекает первый сбалансированный JSON-объект из текста за один проход.
+
+    Учитывает вложенные скобки и фигурные скобки внутри строковых литералов.
+
+    Args:
+        text: Текст ответа, содержащий JSON
+
+    Returns:
+        str или None: Подстрока с JSON-объектом или None, если объект не найден
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    escape = False
+
+    for idx in range(start, len(text)):
+        char = text[idx]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : idx + 1]
+
+    return None
+
+
+class ResponseCache:
+    """
+    Кеш ответов фильтра по точному совпадению нормализованного текста статьи.
+
+    Ключ - SHA-256 от ID потока и нормализованных заголовка и саммари,
+    поэтому одинаковые статьи из разных источников проверяются один раз.
+    """
+
+    def __init__(self, ttl: int = RESPONSE_CACHE_TTL):
+        self.ttl = ttl
+        self._items: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Приводит текст к нижнему регистру, убирает пунктуацию и лишние пробелы."""
+        text = _PUNCTUATION_RE.sub(" ", (text or "").lower())
+        return _WHITESPACE_RE.sub(" ", text).strip()
+
+    def make_key(self, flow_id: str, article: Dict[str, str]) -> str:
+        title = self.normalize(article.get("title", ""))
+        summary = self.normalize(article.get("summary", ""))
+        return hashlib.sha256(f"{flow_id}:{title}|{summary}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, any]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            return dict(value)
+
+    def set(self, key: str, value: Dict[str, any]) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, dict(value))
+
 
 class FilterService:
     def __init__(self):
-        pass
+        self.response_cache = ResponseCache()
+
+    def _persistent_cache_key(
+        self, flow_id: str, article: Dict[str, str]
+    ) -> Optional[str]:
+        """
+        Ключ постоянного кеша: ID потока, версия промпта фильтра и URL статьи.
+        """
+        if not article.get("url"):
+            return None
+        prompt_version = settings.FLOWISE_FILTER_PROMPT_VERSION
+        return f"filter:{flow_id}:{prompt_version}:{article['url']}"
+
+    def _get_cached_relevance(
+        self, cache_key: str, flow_id: str, article: Dict[str, str]
+    ) -> Optional[Dict[str, any]]:
+        """
+        Ищет результат проверки сначала в памяти, затем в постоянном кеше,
+        который переживает перезапуски пайплайна.
+        """
+        cached_result = self.response_cache.get(cache_key)
+        if cached_result is None:
+            persistent_key = self._persistent_cache_key(flow_id, article)
+            if persistent_key:
+                try:
+                    cached_result = caches["flowise"].get(persistent_key)
+                except Exception as e:
+                    logger.warning(f"Ошибка чтения кеша фильтра: {e}")
+                if cached_result is not None:
+                    self.response_cache.set(cache_key, cached_result)
+
+        if cached_result is not None:
+            cached_result["url"] = article.get("url", "")
+        return cached_result
+
+    def _cache_relevance(
+        self, cache_key: str, flow_id: str, article: Dict[str, str], result: Dict
+    ) -> None:
+        """Сохраняет успешный результат проверки в память и в постоянный кеш."""
+        self.response_cache.set(cache_key, result)
+        persistent_key = self._persistent_cache_key(flow_id, article)
+        if persistent_key:
+            try:
+                caches["flowise"].set(persistent_key, result)
+            except Exception as e:
+                logger.warning(f"Ошибка записи кеша фильтра: {e}")
 
     def check_relevance_with_flowise(
         self, article: Dict[str, str], flow_id: str, flowise_host: str
     ) -> Dict[str, any]:
+        cache_key = self.response_cache.make_key(flow_id, article)
+        cached_result = self._get_cached_relevance(cache_key, flow_id, article)
+        if cached_result is not None:
+            logger.debug(
+                "💾 Ответ фильтра взят из кеша: {:.50}...", article.get("title", "")
+            )
+            return cached_result
+
         url = f"{flowise_host}/api/v1/prediction/{flow_id}"
 
         filter_prompt = f"Заголовок: {article.get('title', '')} Краткое содержание: {article.get('summary', '')}"
@@ -20,119 +197,324 @@ class FilterService:
         payload = {"question": filter_prompt}
 
         try:
-            response = requests.post(url, json=payload)
+            response = flowise_session.post(
+                url, json=payload, timeout=FLOWISE_REQUEST_TIMEOUT
+            )
             response.raise_for_status()
 
-            result_text = response.json().get("text", "").strip()
+            result_text = _json_loads(response.content).get("text", "").strip()
 
             # Логируем сырой ответ для отладки
             logger.debug(
-                f"📥 Сырой ответ от Flowise для '{article.get('title', '')[:50]}...': {result_text[:500]}..."
+                "📥 Сырой ответ от Flowise для '{:.50}...': {:.500}...",
+                article.get("title", ""),
+                result_text,
             )
 
-            import json
-            import re
-
-            # Очищаем ответ от markdown блоков
-            clean_text = result_text
-            if "```json" in result_text:
-                # Извлекаем JSON из markdown блока
-                json_match = re.search(
-                    r"```json\s*(\{.*?\})\s*```", result_text, re.DOTALL
+            # Извлекаем JSON-объект, в том числе из markdown блока ```json.
+            # Если в ответе нет ни одной "{", разбирать нечего
+            clean_text = _extract_json_object(result_text)
+            if clean_text is None:
+                logger.warning(
+                    f"❌ В ответе Flowise нет JSON для '{article.get('title', '')[:50]}...': {result_text[:1000]}..."
                 )
-                if json_match:
-                    clean_text = json_match.group(1)
-                    logger.debug(
-                        f"📄 Извлечен JSON из markdown блока: {clean_text[:200]}..."
-                    )
-            else:
-                # Пытаемся найти JSON в тексте без markdown блоков
-                json_match = re.search(r"\{.*\}", result_text, re.DOTALL)
-                if json_match:
-                    clean_text = json_match.group(0)
-                    logger.debug(f"📄 Найден JSON в тексте: {clean_text[:200]}...")
+                return self._error_relevance_check(
+                    article, "Ответ без JSON", "Ответ фильтра не содержит JSON"
+                )
+            logger.debug("📄 Найден JSON в ответе: {:.200}...", clean_text)
 
             try:
-                result = json.loads(clean_text)
+                result = _json_loads(clean_text)
 
-                # Новый формат ответа
-                return {
-                    "is_relevant": result.get("is_relevant", False),
-                    "relevance_reason": result.get(
-                        "relevance_reason", "Нет объяснения"
-                    ),
-                    "interest_score": result.get("interest_score", 0),
-                    "interest_reason": result.get("interest_reason", "Нет объяснения"),
-                    "content_type": result.get("content_type", "Неизвестно"),
-                    "summary": result.get("summary", ""),
-                    "title_ru": result.get("title_ru", ""),
-                    "url": result.get("url", article.get("url", "")),
-                }
+                relevance_check = self._build_relevance_check(result, article)
+                self._cache_relevance(cache_key, flow_id, article, relevance_check)
+                return relevance_check
             except json.JSONDecodeError as e:
                 logger.warning(
                     f"❌ Не удалось парсить JSON ответ для '{article.get('title', '')[:50]}...': {e}"
                 )
                 logger.warning(f"📄 Исходный текст: {result_text[:1000]}...")
                 logger.warning(f"🧹 Очищенный текст: {clean_text[:1000]}...")
-                return {
-                    "is_relevant": False,
-                    "relevance_reason": f"Ошибка парсинга JSON: {str(e)[:100]}",
-                    "interest_score": 0,
-                    "interest_reason": "Ошибка парсинга JSON ответа",
-                    "content_type": "Ошибка",
-                    "summary": "",
-                    "title_ru": "",
-                    "url": article.get("url", ""),
-                }
+                return self._error_relevance_check(
+                    article,
+                    f"Ошибка парсинга JSON: {str(e)[:100]}",
+                    "Ошибка парсинга JSON ответа",
+                )
 
         except Exception as e:
             logger.error(f"Ошибка при проверке релевантности через Flowise: {e}")
-            return {
-                "is_relevant": False,
-                "relevance_reason": "Ошибка API",
-                "interest_score": 0,
-                "interest_reason": "Ошибка API",
-                "content_type": "Ошибка",
-                "summary": "",
-                "title_ru": "",
-                "url": article.get("url", ""),
-            }
+            return self._error_relevance_check(article, "Ошибка API", "Ошибка API")
 
-    def filter_news_with_flowise(
+    def _error_relevance_check(
+        self, article: Dict[str, str], relevance_reason: str, interest_reason: str
+    ) -> Dict[str, any]:
+        """Результат проверки для статьи, которую не удалось оценить."""
+        return {
+            "is_relevant": False,
+            "relevance_reason": relevance_reason,
+            "interest_score": 0,
+            "interest_reason": interest_reason,
+            "content_type": "Ошибка",
+            "summary": "",
+            "title_ru": "",
+            "url": article.get("url", ""),
+        }
+
+    def _build_relevance_check(
+        self, result: Dict[str, any], article: Dict[str, str]
+    ) -> Dict[str, any]:
+        """
+        Приводит разобранный ответ фильтра к формату результата проверки.
+
+        Берутся только известные поля: лишние ключи из ответа модели не
+        попадают в кэш и дальше по пайплайну.
+        """
+        relevance_check = {
+            key: result.get(key, default)
+            for key, default in _RELEVANCE_DEFAULTS.items()
+        }
+        if not relevance_check["url"]:
+            relevance_check["url"] = article.get("url", "")
+        return relevance_check
+
+    def check_relevance_batch_with_flowise(
         self, articles: List[Dict[str, str]], flow_id: str, flowise_host: str
-    ) -> List[Dict[str, str]]:
-        filtered_articles = []
+    ) -> List[Dict[str, any]]:
+        """
+        Проверяет несколько статей одним запросом к Flowise.
 
-        for article in articles:
-            relevance_check = self.check_relevance_with_flowise(
-                article, flow_id, flowise_host
+        В поток отправляется JSON-массив статей, в ответ ожидается JSON-массив
+        результатов той же длины. Если поток вернул ответ в другом формате,
+        статьи проверяются по одной.
+
+        Args:
+            articles: Статьи для проверки
+            flow_id: ID потока Flowise
+            flowise_host: Хост Flowise
+
+        Returns:
+            List[Dict]: Результаты проверки в порядке исходных статей
+        """
+        url = f"{flowise_host}/api/v1/prediction/{flow_id}"
+        question = json.dumps(
+            [
+                {"title": a.get("title", ""), "summary": a.get("summary", "")}
+                for a in articles
+            ],
+            ensure_ascii=False,
+        )
+
+        try:
+            response = flowise_session.post(
+                url, json={"question": question}, timeout=FLOWISE_REQUEST_TIMEOUT
             )
+            response.raise_for_status()
 
-            # Добавляем информацию о фильтрации к статье
-            article_with_meta = article.copy()
-            article_with_meta["filter_result"] = relevance_check
+            result_text = _json_loads(response.content).get("text", "").strip()
+            start = result_text.find("[")
+            end = result_text.rfind("]")
+            results = _json_loads(result_text[start : end + 1]) if start >= 0 else None
+
+            if (
+                isinstance(results, list)
+                and len(results) == len(articles)
+                and all(isinstance(result, dict) for result in results)
+            ):
+                relevance_checks = []
+                for article, result in zip(articles, results):
+                    relevance_check = self._build_relevance_check(result, article)
+                    self._cache_relevance(
+                        self.response_cache.make_key(flow_id, article),
+                        flow_id,
+                        article,
+                        relevance_check,
+                    )
+                    relevance_checks.append(relevance_check)
+                return relevance_checks
 
-            if relevance_check["is_relevant"]:
-                # Используем данные от фильтра, если они есть
-                if relevance_check["title_ru"]:
-                    article_with_meta["title"] = relevance_check["title_ru"]
-                if relevance_check["summary"]:
-                    article_with_meta["summary"] = relevance_check["summary"]
+            logger.warning(
+                f"Flowise вернул ответ не в формате пакета из {len(articles)} статей, проверяем по одной"
+            )
+        except Exception as e:
+            logger.warning(f"Ошибка пакетной проверки через Flowise: {e}")
+
+        return [
+            self.check_relevance_with_flowise(article, flow_id, flowise_host)
+            for article in articles
+        ]
+
+    def check_relevance_batch(
+        self,
+        articles: List[Dict[str, str]],
+        flow_id: str,
+        flowise_host: str,
+        max_workers: int = FLOWISE_MAX_WORKERS,
+        batch_size: Optional[int] = None,
+    ) -> List[Dict[str, any]]:
+        """
+        Проверяет релевантность статей параллельными запросами к Flowise.
 
-                article_with_meta["content_type"] = relevance_check["content_type"]
-                article_with_meta["interest_score"] = relevance_check["interest_score"]
+        Args:
+            articles: Статьи для проверки
+            flow_id: ID потока Flowise
+            flowise_host: Хост Flowise
+            max_workers: Максимальное количество одновременных запросов
+            batch_size: Количество статей в одном запросе (None - по одной статье).
+                Поток Flowise должен поддерживать пакетный формат
 
-                filtered_articles.append(article_with_meta)
-                logger.debug(
-                    f"✓ Статья прошла фильтр: {article['title'][:50]}... (Оценка: {relevance_check['interest_score']}/10, Тип: {relevance_check['content_type']})"
+        Returns:
+            List[Dict]: Результаты проверки в порядке исходных статей
+        """
+        if not articles:
+            return []
+
+        # Статьи с одинаковым URL или одинаковым текстом (одна новость из
+        # разных лент) проверяем через Flowise только один раз. Параллельные
+        # запросы не успевают увидеть кеш друг друга, поэтому повторы
+        # отсекаются до отправки
+        unique_articles = []
+        positions = []
+        url_positions = {}
+        content_positions = {}
+        for article in articles:
+            url = article.get("url", "")
+            content_key = self.response_cache.make_key(flow_id, article)
+            position = url_positions.get(url) if url else None
+            if position is None:
+                position = content_positions.get(content_key)
+            if position is None:
+                position = len(unique_articles)
+                unique_articles.append(article)
+                content_positions[content_key] = position
+            if url:
+                url_positions.setdefault(url, position)
+            positions.append(position)
+
+        if len(unique_articles) < len(articles):
+            logger.debug(
+                f"Пропущено {len(articles) - len(unique_articles)} повторяющихся статей"
+            )
+
+        results = self._run_relevance_checks(
+            unique_articles, flow_id, flowise_host, max_workers, batch_size
+        )
+
+        relevance_checks = []
+        for article, position in zip(articles, positions):
+            result = results[position]
+            if unique_articles[position] is not article:
+                result = result | {"url": article.get("url", "")}
+            relevance_checks.append(result)
+        return relevance_checks
+
+    def _run_relevance_checks(
+        self,
+        articles: List[Dict[str, str]],
+        flow_id: str,
+        flowise_host: str,
+        max_workers: int,
+        batch_size: Optional[int],
+    ) -> List[Dict[str, any]]:
+        """Распределяет проверки статей по пулу потоков."""
+        if batch_size and batch_size > 1:
+            batches = [
+                articles[idx : idx + batch_size]
+                for idx in range(0, len(articles), batch_size)
+            ]
+            workers = max(1, min(max_workers, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                batch_results = executor.map(
+                    lambda batch: self.check_relevance_batch_with_flowise(
+                        batch, flow_id, flowise_host
+                    ),
+                    batches,
                 )
-            else:
+                return [result for batch in batch_results for result in batch]
+
+        workers = max(1, min(max_workers, len(articles)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    lambda article: self.check_relevance_with_flowise(
+                        article, flow_id, flowise_host
+                    ),
+                    articles,
+                )
+            )
+
+    def filter_news_with_flowise(
+        self,
+        articles: List[Dict[str, str]],
+        flow_id: str,
+        flowise_host: str,
+        max_workers: int = FLOWISE_MAX_WORKERS,
+        batch_size: Optional[int] = None,
+        relevance_checks: Optional[List[Dict[str, any]]] = None,
+        max_results: Optional[int] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Возвращает статьи, прошедшие фильтр, отсортированные по интересности.
+
+        Args:
+            articles: Исходные статьи
+            flow_id: ID потока Flowise
+            flowise_host: Хост Flowise
+            max_workers: Максимальное количество одновременных запросов
+            batch_size: Количество статей в одном запросе (None - по одной статье)
+            relevance_checks: Уже полученные результаты проверки для этих статей
+                (например, из get_all_articles_with_filter_results) -
+                в этом случае Flowise повторно не вызывается
+            max_results: Сколько самых интересных статей вернуть
+                (None - все прошедшие фильтр)
+
+        Returns:
+            List[Dict]: Отфильтрованные статьи
+        """
+        filtered_articles = []
+
+        if relevance_checks is None:
+            relevance_checks = self.check_relevance_batch(
+                articles, flow_id, flowise_host, max_workers, batch_size
+            )
+
+        for article, relevance_check in zip(articles, relevance_checks):
+            if not relevance_check["is_relevant"]:
                 logger.debug(
-                    f"✗ Статья отклонена: {article['title'][:50]}... Причина: {relevance_check['relevance_reason']}"
+                    "✗ Статья отклонена: {:.50}... Причина: {}",
+                    article["title"],
+                    relevance_check["relevance_reason"],
                 )
+                continue
+
+            # Добавляем информацию о фильтрации к статье
+            article_with_meta = article | {
+                "filter_result": relevance_check,
+                "content_type": relevance_check["content_type"],
+                "interest_score": relevance_check["interest_score"],
+            }
+
+            # Используем данные от фильтра, если они есть
+            if relevance_check["title_ru"]:
+                article_with_meta["title"] = relevance_check["title_ru"]
+            if relevance_check["summary"]:
+                article_with_meta["summary"] = relevance_check["summary"]
+
+            filtered_articles.append(article_with_meta)
+            logger.debug(
+                "✓ Статья прошла фильтр: {:.50}... (Оценка: {}/10, Тип: {})",
+                article["title"],
+                relevance_check["interest_score"],
+                relevance_check["content_type"],
+            )
 
-        # Сортируем по оценке интереса (от высокой к низкой)
-        filtered_articles.sort(key=lambda x: x.get("interest_score", 0), reverse=True)
+        # Сортируем по оценке интереса (от высокой к низкой). Если нужны
+        # только ТОП-N статей, не сортируем весь список
+        if max_results is not None and max_results < len(filtered_articles):
+            filtered_articles = heapq.nlargest(
+                max_results, filtered_articles, key=_interest_score
+            )
+        else:
+            filtered_articles.sort(key=_interest_score, reverse=True)
 
         logger.info(
             f"📊 Отфильтрованные статьи отсортированы по интересности (от {filtered_articles[0].get('interest_score', 0)}/10 до {filtered_articles[-1].get('interest_score', 0)}/10)"
@@ -143,7 +525,12 @@ class FilterService:
         return filtered_articles
 
     def get_all_articles_with_filter_results(
-        self, articles: List[Dict[str, str]], flow_id: str, flowise_host: str
+        self,
+        articles: List[Dict[str, str]],
+        flow_id: str,
+        flowise_host: str,
+        max_workers: int = FLOWISE_MAX_WORKERS,
+        batch_size: Optional[int] = None,
     ) -> List[Dict[str, str]]:
         """
         Возвращает все статьи с результатами фильтрации (включая отклоненные).
@@ -152,19 +539,24 @@ class FilterService:
             articles: Исходные статьи
             flow_id: ID потока Flowise
             flowise_host: Хост Flowise
+            max_workers: Максимальное количество одновременных запросов
+            batch_size: Количество статей в одном запросе (None - по одной статье)
 
         Returns:
             List[Dict]: Все статьи с информацией о фильтрации
         """
         articles_with_results = []
 
-        for article in articles:
-            relevance_check = self.check_relevance_with_flowise(
-                article, flow_id, flowise_host
-            )
+        relevance_checks = self.check_relevance_batch(
+            articles, flow_id, flowise_host, max_workers, batch_size
+        )
 
-            article_with_meta = article.copy()
-            article_with_meta["filter_result"] = relevance_check
+        for article, relevance_check in zip(articles, relevance_checks):
+            article_with_meta = article | {
+                "filter_result": relevance_check,
+                "content_type": relevance_check["content_type"],
+                "interest_score": relevance_check["interest_score"],
+            }
 
             # Используем данные от фильтра, если они есть
             if relevance_check["title_ru"]:
@@ -172,18 +564,19 @@ class FilterService:
             if relevance_check["summary"]:
                 article_with_meta["summary_filtered"] = relevance_check["summary"]
 
-            article_with_meta["content_type"] = relevance_check["content_type"]
-            article_with_meta["interest_score"] = relevance_check["interest_score"]
-
             articles_with_results.append(article_with_meta)
 
             if relevance_check["is_relevant"]:
                 logger.debug(
-                    f"✓ Статья прошла фильтр: {article['title'][:50]}... (Оценка: {relevance_check['interest_score']}/10)"
+                    "✓ Статья прошла фильтр: {:.50}... (Оценка: {}/10)",
+                    article["title"],
+                    relevance_check["interest_score"],
                 )
             else:
                 logger.debug(
-                    f"✗ Статья отклонена: {article['title'][:50]}... Причина: {relevance_check['relevance_reason']}"
+                    "✗ Статья отклонена: {:.50}... Причина: {}",
+                    article["title"],
+                    relevance_check["relevance_reason"],
                 )
 
         return articles_with_results
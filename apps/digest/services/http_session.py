@@ -0,0 +1,65 @@
+"""
+Общие HTTP-сессии сервисов с пулом keep-alive соединений.
+"""
+
+import atexit
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Таймауты запроса к Flowise: (подключение, ожидание ответа LLM)
+FLOWISE_REQUEST_TIMEOUT = (5, 120)
+
+
+def create_session(
+    pool_maxsize: int = 32, max_retries: Optional[Retry] = None
+) -> requests.Session:
+    """
+    Создает сессию, переиспользующую TCP/TLS соединения между запросами.
+
+    Сессия закрывается автоматически при завершении процесса.
+
+    Args:
+        pool_maxsize: Максимальное количество соединений с одним хостом
+        max_retries: Политика повторов запросов (None - без повторов)
+
+    Returns:
+        requests.Session: Настроенная сессия
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries or 0,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    atexit.register(session.close)
+    return session
+
+
+# Фильтр и копирайтер обращаются к одному хосту Flowise и делят пул соединений
+flowise_session = create_session()
+
+# Сессия OpenAI API: повторяет идемпотентные запросы (скачивание картинок)
+# при ограничении частоты и сбоях сервера. POST генерации изображения
+# платный и не идемпотентный, поэтому не повторяется
+openai_session = create_session(
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+    ),
+)
+
+# Сессия сборщика новостей (Google Custom Search API и RSS-ленты)
+scout_session = create_session(
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+    ),
+)
@@ -1,13 +1,20 @@
-import base64
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import requests
 
 from logger.logger import setup_logger
 
+from .http_session import openai_session
+
 logger = setup_logger(module_name=__name__)
 
+# Количество одновременных запросов к OpenAI при генерации изображений
+IMAGE_GENERATION_MAX_WORKERS = 4
+
 
 class ImageGenerationService:
     """
@@ -28,6 +35,51 @@ class ImageGenerationService:
         self.output_dir = Path("generated_images")
         self.output_dir.mkdir(exist_ok=True)
 
+    @staticmethod
+    def _image_digest(payload: dict) -> str:
+        """
+        Вычисляет стабильный между запусками хеш параметров генерации.
+
+        Args:
+            payload: Параметры запроса к OpenAI API
+
+        Returns:
+            str: Hex-строка хеша
+        """
+        key = "|".join(
+            str(payload[name]) for name in ("model", "size", "quality", "style")
+        )
+        return hashlib.blake2b(
+            f"{key}|{payload['prompt']}".encode("utf-8"), digest_size=8
+        ).hexdigest()
+
+    @staticmethod
+    def _download_image(image_url: str, filepath: Path) -> None:
+        """
+        Скачивает изображение на диск блоками, не держа его целиком в памяти.
+
+        Файл пишется во временный с уникальным именем и переименовывается
+        после загрузки, чтобы оборванная или параллельная загрузка не была
+        принята за готовое изображение.
+
+        Args:
+            image_url: Ссылка на изображение от OpenAI API
+            filepath: Путь для сохранения
+        """
+        with tempfile.NamedTemporaryFile(
+            dir=filepath.parent, prefix=filepath.stem, suffix=".part", delete=False
+        ) as f:
+            tmp_path = Path(f.name)
+        try:
+            with openai_session.get(image_url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+            tmp_path.replace(filepath)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
     def generate_image(self, prompt: str, **kwargs) -> Optional[str]:
         """
         Генерация изображения через OpenAI DALL-E API.
@@ -52,30 +104,33 @@ class ImageGenerationService:
             "quality": kwargs.get("quality", "standard"),
             "style": kwargs.get("style", "natural"),
             "n": 1,
-            "response_format": "b64_json",
+            # Ссылка вместо base64 в JSON: картинка скачивается потоком
+            "response_format": "url",
         }
 
+        # Имя файла - стабильный хеш промпта и параметров генерации, поэтому
+        # то же изображение в следующих запусках берется с диска
+        filepath = self.output_dir / f"openai_{self._image_digest(payload)}.png"
+        if filepath.exists():
+            logger.debug("Изображение уже сгенерировано: {}", filepath)
+            return str(filepath)
+
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
         try:
-            logger.debug(f"Генерируем изображение через OpenAI: {prompt[:50]}...")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            logger.debug("Генерируем изображение через OpenAI: {:.50}...", prompt)
+            response = openai_session.post(
+                url, json=payload, headers=headers, timeout=60
+            )
             response.raise_for_status()
 
-            result = response.json()
-            image_data = base64.b64decode(result["data"][0]["b64_json"])
+            image_url = response.json()["data"][0]["url"]
+            self._download_image(image_url, filepath)
 
-            # Сохраняем изображение
-            filename = f"openai_{hash(prompt) % 1000000}.png"
-            filepath = self.output_dir / filename
-
-            with open(filepath, "wb") as f:
-                f.write(image_data)
-
-            logger.debug(f"✅ Изображение сохранено: {filepath}")
+            logger.debug("✅ Изображение сохранено: {}", filepath)
             return str(filepath)
 
         except requests.exceptions.RequestException as e:
@@ -86,6 +141,11 @@ class ImageGenerationService:
             return None
 
 
+def _post_image_prompt(image_idea: str) -> str:
+    """Дополняет идею изображения от копирайтера общими требованиями к стилю."""
+    return f"Professional, high-quality illustration for social media post about AI and technology. {image_idea}. Modern style, clean design, suitable for Telegram post."
+
+
 def generate_image_for_post(image_idea: str, api_key: str, **kwargs) -> Optional[str]:
     """
     Упрощенная функция для генерации изображения к посту.
@@ -98,7 +158,48 @@ def generate_image_for_post(image_idea: str, api_key: str, **kwargs) -> Optional
     Returns:
         str: Путь к изображению или None при ошибке
     """
-    enhanced_prompt = f"Professional, high-quality illustration for social media post about AI and technology. {image_idea}. Modern style, clean design, suitable for Telegram post."
+    generator = ImageGenerationService(api_key=api_key, **kwargs)
+    return generator.generate_image(_post_image_prompt(image_idea), **kwargs)
+
+
+def generate_images_for_posts(
+    image_ideas: List[str],
+    api_key: str,
+    max_workers: int = IMAGE_GENERATION_MAX_WORKERS,
+    **kwargs,
+) -> List[Optional[str]]:
+    """
+    Генерирует изображения для нескольких постов параллельными запросами.
+
+    Args:
+        image_ideas: Описания изображений от копирайтера
+        api_key: OpenAI API key
+        max_workers: Максимальное количество одновременных запросов
+        **kwargs: Дополнительные параметры для генерации
+
+    Returns:
+        List[Optional[str]]: Пути к изображениям (None при ошибке)
+            в порядке исходных описаний
+    """
+    if not image_ideas:
+        return []
+
+    # Одинаковые описания дают один и тот же файл, поэтому каждое уникальное
+    # описание генерируется один раз, а результат раздается всем постам
+    unique_ideas = list(dict.fromkeys(image_ideas))
 
     generator = ImageGenerationService(api_key=api_key, **kwargs)
-    return generator.generate_image(enhanced_prompt, **kwargs)
+    workers = max(1, min(max_workers, len(unique_ideas)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        paths = dict(
+            zip(
+                unique_ideas,
+                executor.map(
+                    lambda image_idea: generator.generate_image(
+                        _post_image_prompt(image_idea), **kwargs
+                    ),
+                    unique_ideas,
+                ),
+            )
+        )
+    return [paths[image_idea] for image_idea in image_ideas]
@@ -3,11 +3,15 @@
 Обеспечивает сохранение результатов обработки в базу данных.
 """
 
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 from loguru import logger
 
 from ..models import (
+    ACTIVE_CONFIGURATION_CACHE_KEY,
+    ACTIVE_KEYWORDS_CACHE_KEY,
     DigestRun,
     NewsSource,
     Article,
@@ -18,6 +22,11 @@ from ..models import (
 from .scout_service import ScoutService
 from .filter_service import FilterService
 from .copywriter_service import CopywriterService
+from .deduplication_service import DeduplicationService
+
+# Активная конфигурация и ключевые слова меняются редко; кэш дополнительно
+# сбрасывается сигналами при их сохранении или удалении
+ACTIVE_SETTINGS_CACHE_TTL = 60
 
 
 class IntegrationService:
@@ -30,6 +39,7 @@ class IntegrationService:
         self.scout_service = ScoutService()
         self.filter_service = FilterService()
         self.copywriter_service = CopywriterService()
+        self.deduplication_service = DeduplicationService()
 
     def create_digest_run(self) -> DigestRun:
         """
@@ -39,7 +49,7 @@ class IntegrationService:
             DigestRun: Созданный объект запуска
         """
         digest_run = DigestRun.objects.create(
-            status="running", started_at=datetime.now()
+            status="running", started_at=timezone.now()
         )
         logger.info(f"Создан новый запуск дайджеста: {digest_run.id}")
         return digest_run
@@ -66,15 +76,27 @@ class IntegrationService:
             status: Статус выполнения
             error_message: Сообщение об ошибке (если есть)
         """
-        digest_run.total_articles_collected = total_collected
-        digest_run.total_articles_filtered = total_filtered
-        digest_run.total_posts_created = total_posts
-        digest_run.total_images_generated = total_images
-        digest_run.status = status
-        digest_run.error_message = error_message
+        fields = {
+            "total_articles_collected": total_collected,
+            "total_articles_filtered": total_filtered,
+            "total_posts_created": total_posts,
+            "total_images_generated": total_images,
+            "status": status,
+            "error_message": error_message,
+        }
         if status in ["completed", "failed", "partial"]:
-            digest_run.finished_at = datetime.now()
-        digest_run.save()
+            fields["finished_at"] = timezone.now()
+
+        # Обновляем только изменившиеся поля одним UPDATE без чтения записи
+        changed = {
+            name: value
+            for name, value in fields.items()
+            if getattr(digest_run, name) != value
+        }
+        if changed:
+            DigestRun.objects.filter(pk=digest_run.pk).update(**changed)
+            for name, value in changed.items():
+                setattr(digest_run, name, value)
 
         logger.info(f"Обновлена статистика запуска {digest_run.id}: {status}")
 
@@ -100,10 +122,76 @@ class IntegrationService:
         if created:
             logger.info(f"Создан новый источник новостей: {source_name}")
         else:
-            logger.debug(f"Используется существующий источник: {source_name}")
+            logger.debug("Используется существующий источник: {}", source_name)
 
         return source
 
+    @staticmethod
+    def _news_source_spec(
+        article_data: Dict[str, str],
+    ) -> Optional[Tuple[str, str, str]]:
+        """
+        Определяет источник статьи по полю source.
+
+        Args:
+            article_data: Данные статьи
+
+        Returns:
+            Tuple или None: (название, URL, тип) источника или None,
+                если источник не распознан
+        """
+        source_info = article_data.get("source")
+        if not source_info:
+            return None
+        if "Google Search" in source_info:
+            return (
+                f"Google Search: {source_info.split(':')[-1].strip()}",
+                "",
+                "google",
+            )
+        if "RSS" in source_info:
+            return source_info, "", "rss"
+        return None
+
+    def get_or_create_news_sources(
+        self, specs: Iterable[Tuple[str, str, str]]
+    ) -> Dict[str, NewsSource]:
+        """
+        Получает или создает несколько источников новостей за два запроса.
+
+        Args:
+            specs: Тройки (название, URL, тип) источников
+
+        Returns:
+            Dict[str, NewsSource]: Источники по названию
+        """
+        wanted = {}
+        for name, url, source_type in specs:
+            wanted.setdefault(name, (url, source_type))
+        if not wanted:
+            return {}
+
+        with transaction.atomic():
+            sources = {}
+            for existing in NewsSource.objects.filter(name__in=wanted).order_by("pk"):
+                sources.setdefault(existing.name, existing)
+
+            created = NewsSource.objects.bulk_create(
+                [
+                    NewsSource(
+                        name=name, url=url, source_type=source_type, is_active=True
+                    )
+                    for name, (url, source_type) in wanted.items()
+                    if name not in sources
+                ]
+            )
+
+        for new_source in created:
+            sources[new_source.name] = new_source
+            logger.info(f"Создан новый источник новостей: {new_source.name}")
+
+        return sources
+
     def save_articles_to_db(
         self,
         digest_run: DigestRun,
@@ -121,47 +209,53 @@ class IntegrationService:
         Returns:
             List[Article]: Список созданных объектов статей
         """
-        saved_articles = []
+        # Источники статей определяем заранее и находим или создаем пачкой,
+        # а не запросом на каждую статью
+        source_specs = [
+            None if source else self._news_source_spec(article_data)
+            for article_data in articles
+        ]
+        sources = {}
+        try:
+            sources = self.get_or_create_news_sources(filter(None, source_specs))
+        except Exception as e:
+            logger.error(f"Ошибка получения источников новостей: {e}")
+
+        new_articles = []
 
-        for article_data in articles:
+        for article_data, source_spec in zip(articles, source_specs):
             try:
                 # Определяем источник из данных статьи, если не передан
                 article_source = source
-                if not article_source and "source" in article_data:
-                    source_info = article_data["source"]
-                    if "Google Search" in source_info:
-                        article_source = self.get_or_create_news_source(
-                            f"Google Search: {source_info.split(':')[-1].strip()}",
-                            "",
-                            "google",
-                        )
-                    elif "RSS" in source_info:
-                        article_source = self.get_or_create_news_source(
-                            source_info, "", "rss"
-                        )
-
-                # Создаем статью
-                article = Article.objects.create(
-                    digest_run=digest_run,
-                    source=article_source,
-                    title=article_data.get("title", ""),
-                    url=article_data.get("url", ""),
-                    summary=article_data.get("summary", ""),
-                    content_type=article_data.get("content_type", "other"),
-                    interest_score=article_data.get("interest_score", 0),
-                    is_relevant=article_data.get("is_relevant", False),
-                    relevance_reason=article_data.get("relevance_reason", ""),
-                    interest_reason=article_data.get("interest_reason", ""),
+                if source_spec:
+                    article_source = sources.get(source_spec[0])
+
+                new_articles.append(
+                    Article(
+                        source=article_source,
+                        title=article_data.get("title", ""),
+                        url=article_data.get("url", ""),
+                        summary=article_data.get("summary", ""),
+                        content_type=article_data.get("content_type", "other"),
+                        interest_score=article_data.get("interest_score", 0),
+                        is_relevant=article_data.get("is_relevant", False),
+                        relevance_reason=article_data.get("relevance_reason", ""),
+                        interest_reason=article_data.get("interest_reason", ""),
+                    )
                 )
 
-                saved_articles.append(article)
-
             except Exception as e:
                 logger.error(
-                    f"Ошибка сохранения статьи '{article_data.get('title', '')}': {e}"
+                    f"Ошибка подготовки статьи '{article_data.get('title', '')}': {e}"
                 )
                 continue
 
+        try:
+            saved_articles = Article.bulk_ingest(digest_run, new_articles)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения статей: {e}")
+            return []
+
         logger.info(f"Сохранено {len(saved_articles)} статей в базу данных")
         return saved_articles
 
@@ -177,38 +271,54 @@ class IntegrationService:
         Returns:
             List[GeneratedPost]: Список созданных объектов постов
         """
-        saved_posts = []
-
+        normalize_url = self.deduplication_service.normalize_url
+
+        # Одним запросом находим для каждого URL самую интересную статью,
+        # у которой еще нет поста
+        article_ids = {}
+        for normalized_url, article_id in (
+            Article.objects.filter(
+                normalized_url__in={
+                    normalize_url(article_data.get("url", ""))
+                    for article_data in articles_with_posts
+                },
+                generated_post__isnull=True,
+            )
+            .order_by("-interest_score", "-collected_at")
+            .values_list("normalized_url", "id")
+        ):
+            article_ids.setdefault(normalized_url, article_id)
+
+        new_posts = []
         for article_data in articles_with_posts:
-            try:
-                # Находим соответствующую статью в базе
-                article = Article.objects.filter(
-                    url=article_data.get("url", "")
-                ).first()
-
-                if not article:
-                    logger.warning(
-                        f"Статья для поста не найдена: {article_data.get('title', '')}"
-                    )
-                    continue
+            article_id = article_ids.pop(
+                normalize_url(article_data.get("url", "")), None
+            )
+            if article_id is None:
+                logger.warning(
+                    f"Статья для поста не найдена: {article_data.get('title', '')}"
+                )
+                continue
 
-                # Создаем пост
-                post = GeneratedPost.objects.create(
-                    article=article,
+            new_posts.append(
+                GeneratedPost(
+                    article_id=article_id,
                     platform="telegram",  # По умолчанию Telegram
                     post_content=article_data.get("post_content", ""),
                     image_idea=article_data.get("image_idea", ""),
                     image_path=article_data.get("image_path", ""),
                     is_published=False,
                 )
+            )
 
-                saved_posts.append(post)
-
-            except Exception as e:
-                logger.error(
-                    f"Ошибка сохранения поста для статьи '{article_data.get('title', '')}': {e}"
+        try:
+            with transaction.atomic():
+                saved_posts = GeneratedPost.objects.bulk_create(
+                    new_posts, batch_size=500
                 )
-                continue
+        except Exception as e:
+            logger.error(f"Ошибка сохранения постов: {e}")
+            return []
 
         logger.info(f"Сохранено {len(saved_posts)} постов в базу данных")
         return saved_posts
@@ -221,7 +331,12 @@ class IntegrationService:
             Configuration: Активная конфигурация или None
         """
         try:
-            config = Configuration.objects.get(is_active=True)
+            config = cache.get(ACTIVE_CONFIGURATION_CACHE_KEY)
+            if config is None:
+                config = Configuration.objects.get(is_active=True)
+                cache.set(
+                    ACTIVE_CONFIGURATION_CACHE_KEY, config, ACTIVE_SETTINGS_CACHE_TTL
+                )
             logger.info(f"Используется конфигурация: {config.name}")
             return config
         except Configuration.DoesNotExist:
@@ -238,8 +353,12 @@ class IntegrationService:
         Returns:
             List[str]: Список активных ключевых слов
         """
-        keywords = list(
-            Keyword.objects.filter(is_active=True).values_list("keyword", flat=True)
+        keywords = cache.get_or_set(
+            ACTIVE_KEYWORDS_CACHE_KEY,
+            lambda: list(
+                Keyword.objects.filter(is_active=True).values_list("keyword", flat=True)
+            ),
+            ACTIVE_SETTINGS_CACHE_TTL,
         )
         logger.info(f"Получено {len(keywords)} активных ключевых слов")
         return keywords
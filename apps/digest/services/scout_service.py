@@ -1,25 +1,57 @@
 import requests
 import feedparser
 
-from datetime import datetime, timedelta
+import calendar
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-from typing import List, Dict, Optional
-import ssl
+from typing import List, Dict, Optional, Set, Tuple
 import urllib3
 
-
-from newspaper import Article  # не увидел такого файла в репозитории
+from django.conf import settings
+from newspaper import Article, Config  # не увидел такого файла в репозитории
 from logger.logger import setup_logger
 
+from .http_session import scout_session
+
 logger = setup_logger(module_name=__name__)
 
+# Количество одновременно скачиваемых статей
+SCOUT_MAX_WORKERS = settings.SCOUT_MAX_WORKERS
+
+# Количество одновременных запросов к Google Custom Search API
+GOOGLE_SEARCH_MAX_WORKERS = 10
+
+# Общие настройки newspaper: объект только читается при обработке статей,
+# поэтому один экземпляр используется всеми потоками
+_NEWSPAPER_CONFIG = Config()
+_NEWSPAPER_CONFIG.language = "ru"
+_NEWSPAPER_CONFIG.browser_user_agent = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+)
+_NEWSPAPER_CONFIG.request_timeout = 10
 
 # Отключаем предупреждения SSL для RSS лент
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Список доменов-агрегаторов, которые следует исключать из результатов
 # Агрегаторы не предоставляют оригинальный контент, а лишь ссылаются на другие источники
-BLOCKED_DOMAINS = {"news.google.com", "news.ycombinator.com"}
+BLOCKED_DOMAINS = frozenset({"news.google.com", "news.ycombinator.com"})
+
+# Упрощаем запрос - используем только основные английские ключевые слова для Google API
+# Преобразуем русские запросы в английские аналоги
+QUERY_MAPPING = {
+    "искусственный интеллект": "artificial intelligence",
+    "машинное обучение": "machine learning",
+    "нейросети": "neural networks",
+    "Python разработка": "Python development",
+    "Python инструменты": "Python tools",
+    "Python библиотеки": "Python libraries",
+    "Python фреймворки": "Python frameworks",
+    "Python обучение": "Python tutorial",
+    "Python мемы": "Python programming",
+    "Python история": "Python news",
+}
 
 
 class ScoutService:
@@ -32,6 +64,9 @@ class ScoutService:
     - Фильтрация нежелательных источников
     """
 
+    # Создавать саммари через newspaper NLP вместо первых предложений текста
+    use_nlp = False
+
     def __init__(self):
         pass
 
@@ -68,23 +103,8 @@ class ScoutService:
         """
         url = "https://www.googleapis.com/customsearch/v1"
 
-        # Упрощаем запрос - используем только основные английские ключевые слова для Google API
-        # Преобразуем русские запросы в английские аналоги
-        query_mapping = {
-            "искусственный интеллект": "artificial intelligence",
-            "машинное обучение": "machine learning",
-            "нейросети": "neural networks",
-            "Python разработка": "Python development",
-            "Python инструменты": "Python tools",
-            "Python библиотеки": "Python libraries",
-            "Python фреймворки": "Python frameworks",
-            "Python обучение": "Python tutorial",
-            "Python мемы": "Python programming",
-            "Python история": "Python news",
-        }
-
         # Заменяем русские запросы на английские
-        english_query = query_mapping.get(query, query)
+        english_query = QUERY_MAPPING.get(query, query)
 
         # Параметры поиска оптимизированы для получения свежих новостей
         params = {
@@ -99,7 +119,7 @@ class ScoutService:
         }
 
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = scout_session.get(url, params=params, timeout=10)
             resp.raise_for_status()
 
             items = resp.json().get("items", [])
@@ -143,13 +163,22 @@ class ScoutService:
         try:
             logger.debug(f"Начинаем парсинг RSS: {feed_url}")
 
-            # Настраиваем SSL контекст для обхода проблем с сертификатами
-            if hasattr(ssl, "_create_unverified_context"):
-                ssl._create_default_https_context = ssl._create_unverified_context
-
-            # Парсим RSS-ленту с дополнительными заголовками
+            # Скачиваем ленту один раз через общую сессию (keep-alive между
+            # лентами одного хоста, повторы при 429/5xx) и разбираем уже
+            # загруженные байты. Сертификаты не проверяем - у части лент
+            # проблемы с цепочкой сертификатов
+            response = scout_session.get(
+                feed_url,
+                headers={"User-Agent": "Mozilla/5.0 (compatible; RSS Reader)"},
+                timeout=10,
+                verify=False,
+            )
+            response.raise_for_status()
+            # feedparser ищет заголовки в нижнем регистре (content-type), иначе
+            # кодировка из charset теряется и не-UTF-8 ленты ломаются
             feed = feedparser.parse(
-                feed_url, agent="Mozilla/5.0 (compatible; RSS Reader)"
+                response.content,
+                response_headers={k.lower(): v for k, v in response.headers.items()},
             )
 
             if feed.bozo:
@@ -163,34 +192,35 @@ class ScoutService:
 
             logger.debug(f"RSS {feed_url}: найдено {len(feed.entries)} записей всего")
 
-            # Определяем временные рамки для фильтрации
-            cutoff = datetime.now() - timedelta(hours=hours)
+            # Определяем временные рамки для фильтрации. published_parsed
+            # feedparser приводит к UTC, поэтому сравниваем Unix-время
+            cutoff_ts = time.time() - hours * 3600
             news = []
 
             # Обрабатываем каждую запись в ленте
             for entry in feed.entries:
                 try:
+                    # Сначала дешевая проверка домена, затем дата публикации
+                    if urlparse(entry.link).netloc in BLOCKED_DOMAINS:
+                        continue
+
                     # Получаем дату публикации (может отсутствовать)
                     published = getattr(entry, "published_parsed", None)
                     if not published:
-                        # Если даты нет, берем текущую дату (для свежих лент)
+                        # Если даты нет, считаем статью свежей
                         logger.debug(
-                            f"Нет даты публикации для {entry.get('title', 'Unknown')}, используем как свежую"
+                            "Нет даты публикации для {}, используем как свежую",
+                            entry.get("title", "Unknown"),
                         )
-                        published_dt = datetime.now()
-                    else:
-                        # Конвертируем в объект datetime
-                        published_dt = datetime(*published[:6])
-
-                    # Проверяем, что статья свежая и от допустимого источника
-                    if published_dt > cutoff and self.is_valid_article(entry.link):
-                        news.append({"title": entry.title, "link": entry.link})
-                        logger.debug(f"Добавлена статья: {entry.title[:50]}...")
-                    elif published_dt <= cutoff:
-                        logger.debug(f"Статья слишком старая: {entry.title[:50]}...")
+                    elif calendar.timegm(published) <= cutoff_ts:
+                        logger.debug("Статья слишком старая: {:.50}...", entry.title)
+                        continue
+
+                    news.append({"title": entry.title, "link": entry.link})
+                    logger.debug("Добавлена статья: {:.50}...", entry.title)
 
                 except Exception as e:
-                    logger.debug(f"Ошибка обработки записи RSS: {e}")
+                    logger.debug("Ошибка обработки записи RSS: {}", e)
                     continue
 
             logger.debug(f"RSS {feed_url}: найдено {len(news)} свежих статей")
@@ -198,37 +228,15 @@ class ScoutService:
 
         except Exception as e:
             logger.error(f"Ошибка при обработке RSS {feed_url}: {e}")
-            # Попытка с упрощенной обработкой
-            try:
-                logger.debug(
-                    f"Повторная попытка загрузки RSS с базовыми настройками: {feed_url}"
-                )
-
-                # Простая загрузка без SSL проверок
-                feed = feedparser.parse(feed_url)
-                if feed.entries:
-                    logger.debug(
-                        f"Успешно загружено {len(feed.entries)} записей после повторной попытки"
-                    )
-                    # Простая обработка без фильтрации по дате в случае проблем
-                    valid_entries = []
-                    for entry in feed.entries[:5]:  # Берем первые 5
-                        if hasattr(entry, "title") and hasattr(entry, "link"):
-                            valid_entries.append(
-                                {"title": entry.title, "link": entry.link}
-                            )
-                    return valid_entries
-            except Exception as e2:
-                logger.error(f"Повторная попытка также неудачна для {feed_url}: {e2}")
-
             return []
 
     def extract_summary(self, url: str) -> Optional[Dict[str, str]]:
         """
         Извлекает полный текст статьи и создает ее краткое содержание.
 
-        Использует библиотеку newspaper3k для скачивания, парсинга
-        и автоматического создания саммари статьи.
+        Использует библиотеку newspaper3k для скачивания и парсинга статьи.
+        Саммари - первые предложения текста, либо результат NLP newspaper3k,
+        если включен флаг use_nlp.
 
         Args:
             url: URL статьи для обработки
@@ -237,14 +245,8 @@ class ScoutService:
             Dict или None: Словарь с ключами 'title', 'summary', 'url' или None при ошибке
         """
         try:
-            # Создаем объект статьи с указанием языка
-            article = Article(url, language="ru")
-
-            # Настраиваем заголовки для лучшей совместимости
-            article.config.browser_user_agent = (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            )
-            article.config.request_timeout = 10
+            # Создаем объект статьи с общими настройками (язык, заголовки, таймаут)
+            article = Article(url, config=_NEWSPAPER_CONFIG)
 
             # Скачиваем HTML-содержимое
             article.download()
@@ -254,25 +256,23 @@ class ScoutService:
 
             # Проверяем базовые данные перед NLP
             if not article.title:
-                logger.debug(f"Не удалось извлечь заголовок для {url}")
+                logger.debug("Не удалось извлечь заголовок для {}", url)
                 return None
 
-            # Выполняем NLP-обработку (создание саммари, извлечение ключевых слов)
-            try:
-                article.nlp()
-            except Exception as nlp_error:
-                logger.debug(
-                    f"NLP ошибка для {url}: {nlp_error}, используем текст статьи"
-                )
-                # Если NLP не работает, создаем краткое саммари из текста
-                if article.text:
-                    # Берем первые 2-3 предложения как саммари
-                    sentences = article.text.split(".")[:3]
-                    article.summary = ". ".join(sentences).strip() + "."
+            # NLP-обработка (nltk: токенизация и частотный анализ) дорогая,
+            # поэтому включается флагом use_nlp
+            if self.use_nlp:
+                try:
+                    article.nlp()
+                except Exception as nlp_error:
+                    logger.debug(
+                        "NLP ошибка для {}: {}, используем текст статьи", url, nlp_error
+                    )
 
-            # Если саммари пустое, используем начало текста статьи
+            # Без NLP берем первые 2-3 предложения текста как саммари
             if not article.summary and article.text:
-                article.summary = article.text[:300] + "..."
+                sentences = article.text.split(".")[:3]
+                article.summary = ". ".join(sentences).strip() + "."
 
             # Если все еще нет саммари, используем мета-описание
             if not article.summary:
@@ -285,13 +285,70 @@ class ScoutService:
                 "source": "extracted",  # Будет переопределено в collect_insights
             }
 
-            logger.debug(f"Успешно обработана статья: {article.title[:50]}...")
+            logger.debug("Успешно обработана статья: {:.50}...", article.title)
             return result
 
         except Exception as e:
             logger.debug(f"Ошибка при обработке {url}: {e}")
             return None
 
+    def extract_summaries(
+        self,
+        groups: List[Tuple[str, List[str]]],
+        limit: Optional[int] = None,
+        max_workers: int = SCOUT_MAX_WORKERS,
+        seen_links: Optional[Set[str]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Извлекает статьи нескольких источников параллельно.
+
+        Ссылки обрабатываются волнами: в каждую волну от источника попадает
+        столько ссылок, сколько статей ему еще не хватает до лимита, поэтому
+        лишние страницы не скачиваются, а неудачные заменяются следующими.
+        Ссылка, уже взятая в работу для другого источника, не скачивается
+        повторно.
+
+        Args:
+            groups: Пары (метка источника, ссылки на статьи)
+            limit: Максимальное количество статей с источника (None - все)
+            max_workers: Максимальное количество одновременных загрузок
+            seen_links: Уже обработанные ссылки; множество дополняется, поэтому
+                его можно передать в несколько вызовов
+
+        Returns:
+            List[Dict]: Статьи в порядке источников и ссылок, с полем source
+        """
+        summaries: List[List[Dict[str, str]]] = [[] for _ in groups]
+        cursors = [0] * len(groups)
+        if seen_links is None:
+            seen_links = set()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                wave = []
+                for idx, (_, links) in enumerate(groups):
+                    need = len(links) if limit is None else limit - len(summaries[idx])
+                    while need > 0 and cursors[idx] < len(links):
+                        link = links[cursors[idx]]
+                        cursors[idx] += 1
+                        if link in seen_links:
+                            continue
+                        seen_links.add(link)
+                        wave.append((idx, link))
+                        need -= 1
+
+                if not wave:
+                    break
+
+                for (idx, _), summary in zip(
+                    wave, executor.map(lambda task: self.extract_summary(task[1]), wave)
+                ):
+                    if summary:
+                        summary["source"] = groups[idx][0]
+                        summaries[idx].append(summary)
+
+        return [summary for group in summaries for summary in group]
+
     def collect_insights(
         self,
         keywords: List[str],
@@ -319,6 +376,8 @@ class ScoutService:
             List[Dict]: Список обработанных статей с заголовками, саммари и URL
         """
         results = []
+        # Одна ссылка из нескольких запросов и лент скачивается один раз
+        seen_links: Set[str] = set()
 
         # Поиск через Google Custom Search API
         if google_api and google_cse:
@@ -327,20 +386,29 @@ class ScoutService:
             )
             google_results_start = len(results)
 
-            for kw in keywords:
-                logger.debug(f"Поиск по ключевому слову: '{kw}'")
-
-                # Получаем список статей по ключевому слову
-                items = self.search_google_news(
-                    kw, google_api, google_cse, max_per_source
+            # Запросы по всем ключевым словам выполняем параллельно, не больше
+            # GOOGLE_SEARCH_MAX_WORKERS одновременно. Это ограничение числа
+            # параллельных запросов, а не их частоты: при превышении лимита
+            # API отвечает 429, и scout_session повторяет запрос с паузой
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(GOOGLE_SEARCH_MAX_WORKERS, len(keywords)))
+            ) as executor:
+                keywords_items = list(
+                    executor.map(
+                        lambda kw: self.search_google_news(
+                            kw, google_api, google_cse, max_per_source
+                        ),
+                        keywords,
+                    )
                 )
 
-                # Обрабатываем каждую найденную статью
-                for item in items:
-                    summary = self.extract_summary(item["link"])
-                    if summary:
-                        summary["source"] = f"Google Search: {kw}"
-                        results.append(summary)
+            groups = [
+                (f"Google Search: {kw}", [item["link"] for item in items])
+                for kw, items in zip(keywords, keywords_items)
+            ]
+
+            # Скачиваем и обрабатываем все найденные статьи параллельно
+            results.extend(self.extract_summaries(groups, seen_links=seen_links))
 
             google_results_count = len(results) - google_results_start
             logger.info(f"✅ Google Search: обработано {google_results_count} статей")
@@ -352,27 +420,28 @@ class ScoutService:
             logger.info(f"📡 Начинаем обработку {len(rss_feeds)} RSS-лент...")
             rss_results_start = len(results)
 
-            for feed_url in rss_feeds:
-                logger.debug(f"Обрабатываем RSS: {feed_url}")
-
-                # Получаем заголовки из RSS с указанным периодом
-                items = self.fetch_rss_headlines(feed_url, rss_hours)
-
-                # Обрабатываем ограниченное количество статей с каждой ленты
-                processed_count = 0
-                for item in items:
-                    if processed_count >= max_per_source:
-                        break
+            # Получаем заголовки из всех RSS-лент с указанным периодом параллельно
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(SCOUT_MAX_WORKERS, len(rss_feeds)))
+            ) as executor:
+                feeds_items = list(
+                    executor.map(
+                        lambda feed_url: self.fetch_rss_headlines(feed_url, rss_hours),
+                        rss_feeds,
+                    )
+                )
 
-                    summary = self.extract_summary(item["link"])
-                    if summary:
-                        # Добавляем информацию об RSS источнике
-                        from urllib.parse import urlparse
+            groups = [
+                (f"RSS: {urlparse(feed_url).netloc}", [item["link"] for item in items])
+                for feed_url, items in zip(rss_feeds, feeds_items)
+            ]
 
-                        domain = urlparse(feed_url).netloc
-                        summary["source"] = f"RSS: {domain}"
-                        results.append(summary)
-                        processed_count += 1
+            # Обрабатываем ограниченное количество статей с каждой ленты
+            results.extend(
+                self.extract_summaries(
+                    groups, limit=max_per_source, seen_links=seen_links
+                )
+            )
 
             rss_results_count = len(results) - rss_results_start
             logger.info(
@@ -381,17 +450,6 @@ class ScoutService:
         else:
             logger.info("⏭️  RSS ленты отключены")
 
-        # Удаляем дубликаты по URL
-        unique_results = []
-        seen_urls = set()
-
-        for result in results:
-            if result["url"] not in seen_urls:
-                unique_results.append(result)
-                seen_urls.add(result["url"])
-
-        logger.info(
-            f"Собрано {len(unique_results)} уникальных статей (было {len(results)} до удаления дубликатов)"
-        )
+        logger.info(f"Собрано {len(results)} уникальных статей")
 
-        return unique_results
+        return results
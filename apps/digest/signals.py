@@ -0,0 +1,26 @@
+"""
+Сигналы приложения digest.
+"""
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    ACTIVE_CONFIGURATION_CACHE_KEY,
+    ACTIVE_KEYWORDS_CACHE_KEY,
+    Configuration,
+    Keyword,
+)
+
+
+@receiver([post_save, post_delete], sender=Configuration)
+def reset_active_configuration_cache(sender, **kwargs):
+    """Сбрасывает кэш активной конфигурации после ее изменения."""
+    cache.delete(ACTIVE_CONFIGURATION_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Keyword)
+def reset_active_keywords_cache(sender, **kwargs):
+    """Сбрасывает кэш активных ключевых слов после их изменения."""
+    cache.delete(ACTIVE_KEYWORDS_CACHE_KEY)
@@ -121,6 +121,35 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Результаты фильтра Flowise сохраняются между запусками пайплайна
+    "flowise": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env(
+            "FLOWISE_CACHE_DIR", default=str(BASE_DIR / ".cache" / "flowise")
+        ),
+        "TIMEOUT": env.int("FLOWISE_CACHE_TIMEOUT", default=7 * 24 * 60 * 60),
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    },
+}
+
+# Версия промпта фильтра в Flowise: увеличьте при изменении промпта,
+# чтобы сбросить закешированные результаты фильтрации
+FLOWISE_FILTER_PROMPT_VERSION = env("FLOWISE_FILTER_PROMPT_VERSION", default="1")
+
+# Количество одновременных запросов к Flowise на этапах фильтрации и копирайтинга
+FLOWISE_FILTER_MAX_WORKERS = env.int("FLOWISE_FILTER_MAX_WORKERS", default=8)
+FLOWISE_COPYWRITER_MAX_WORKERS = env.int("FLOWISE_COPYWRITER_MAX_WORKERS", default=4)
+
+# Количество одновременно скачиваемых статей при сборе новостей
+SCOUT_MAX_WORKERS = env.int("SCOUT_MAX_WORKERS", default=16)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -22,11 +22,14 @@ sys.path.insert(0, str(project_root))
 
 from agents.pipeline import run_news_pipeline_with_tracking
 from config import settings
-from email_sender import send_email_notification, validate_email_configuration
+from apps.digest.services.email_service import EmailService
 from logger.logger import setup_logger
 
 logger = setup_logger(module_name=__name__)
 
+# SMTP-соединение переиспользуется между отправками и закрывается в конце main()
+email_service = EmailService()
+
 
 def print_banner():
     """Печатает баннер приложения."""
@@ -90,7 +93,7 @@ def validate_configuration() -> bool:
         logger.warning("   Изображения создаваться не будут")
 
     # Проверяем настройки email
-    if not validate_email_configuration():
+    if not email_service.validate_email_configuration():
         return False
 
     logger.info("✅ Конфигурация проверена")
@@ -544,7 +547,7 @@ def main():
 
             # Отправляем email уведомление
             summary_file = output_dir / f"summary_{timestamp}.txt"
-            email_sent = send_email_notification(
+            email_sent = email_service.send_email_notification(
                 posts=final_posts,
                 markdown_file=markdown_file,
                 summary_file=summary_file if summary_file.exists() else None,
@@ -581,7 +584,7 @@ def main():
 
             # Отправляем email уведомление даже если постов нет
             summary_file = output_dir / f"summary_{timestamp}.txt"
-            email_sent = send_email_notification(
+            email_sent = email_service.send_email_notification(
                 posts=[],  # Пустой список постов
                 markdown_file=None,
                 summary_file=None,
@@ -604,6 +607,8 @@ def main():
         logger.error(f"❌ Критическая ошибка в pipeline: {e}")
         logger.exception("Детали ошибки:")
         sys.exit(1)
+    finally:
+        email_service.close()
 
     logger.info("✅ Программа завершена")
 
@@ -0,0 +1,26 @@
+"""
+Тесты разбора ответов копирайтера.
+"""
+
+from apps.digest.services.copywriter_service import _parse_copywriter_response
+
+
+def test_parse_json_response():
+    text = '{"post": " **Новость**\\n\\nТекст ", "image_idea": "Змея"}'
+    assert _parse_copywriter_response(text) == {
+        "post": "**Новость**\n\nТекст",
+        "image_idea": "Змея",
+    }
+
+
+def test_parse_sectioned_response():
+    text = "post: **Новость**\n\nТекст поста\nimage_idea: Змея\n  на ноутбуке"
+    assert _parse_copywriter_response(text) == {
+        "post": "**Новость**\n\nТекст поста",
+        "image_idea": "Змея на ноутбуке",
+    }
+
+
+def test_parse_unstructured_response():
+    assert _parse_copywriter_response("Просто текст") is None
+    assert _parse_copywriter_response('{"text": "нет полей"}') is None
@@ -0,0 +1,51 @@
+"""
+Тесты дедупликации статей.
+"""
+
+from apps.digest.services.deduplication_service import DeduplicationService
+
+
+def test_find_duplicates_by_similar_title():
+    articles = [
+        {"title": "Python 3.14 released", "url": "https://a.com/1", "summary": ""},
+        {"title": "Python 3.14 Released!", "url": "https://b.com/2", "summary": ""},
+        {"title": "Django 6.0 roadmap", "url": "https://c.com/3", "summary": ""},
+    ]
+
+    unique = DeduplicationService().find_duplicates(articles)
+
+    assert [a["url"] for a in unique] == ["https://a.com/1", "https://c.com/3"]
+
+
+def test_find_duplicates_by_similar_summary():
+    summary = "Новая версия библиотеки ускоряет сериализацию в несколько раз"
+    articles = [
+        {"title": "Релиз orjson", "url": "https://a.com/1", "summary": summary},
+        {"title": "Что нового", "url": "https://b.com/2", "summary": summary + "."},
+    ]
+
+    unique = DeduplicationService().find_duplicates(articles)
+
+    assert len(unique) == 1
+
+
+def test_find_duplicates_ignores_tracking_params():
+    articles = [
+        {"title": "A", "url": "https://Example.com/post/?utm_source=x", "summary": ""},
+        {"title": "B", "url": "https://example.com/post", "summary": ""},
+    ]
+
+    unique = DeduplicationService().find_duplicates(articles, check_content=False)
+
+    assert len(unique) == 1
+
+
+def test_find_duplicates_respects_similarity_threshold():
+    articles = [
+        {"title": "Python tips", "url": "https://a.com/1", "summary": ""},
+        {"title": "Python tips and tricks", "url": "https://b.com/2", "summary": ""},
+    ]
+    service = DeduplicationService()
+
+    assert len(service.find_duplicates(articles, similarity_threshold=0.85)) == 2
+    assert len(service.find_duplicates(articles, similarity_threshold=0.6)) == 1
@@ -0,0 +1,21 @@
+"""
+Тесты формирования HTML-письма в EmailService.
+"""
+
+from apps.digest.services.email_service import EmailService
+
+
+def test_create_email_content_escapes_post_fields():
+    html = EmailService().create_email_content(
+        [{"title": "<b>A & B</b>", "description": "строка\nвторая", "url": "#"}], 1
+    )
+    assert "&lt;b&gt;A &amp; B&lt;/b&gt;" in html
+    assert "строка<br>вторая" in html
+
+
+def test_create_email_content_tolerates_none_and_non_str_values():
+    post = {"title": None, "content_type": None, "description": 42, "url": None}
+    html = EmailService().create_email_content([post], 1)
+    assert "Без названия" in html
+    assert "Материал" in html
+    assert "42" in html
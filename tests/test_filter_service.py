@@ -0,0 +1,56 @@
+"""
+Тесты разбора ответов Flowise в FilterService.
+"""
+
+from apps.digest.services.filter_service import FilterService, _extract_json_object
+
+
+def test_extract_json_object_from_text():
+    text = 'Вот результат: {"is_relevant": true, "interest_score": 7} Спасибо!'
+    assert _extract_json_object(text) == '{"is_relevant": true, "interest_score": 7}'
+
+
+def test_extract_json_object_nested_and_braces_in_strings():
+    text = 'ответ {"a": {"b": "}{"}, "c": "кавычка \\" и {"} хвост }'
+    assert _extract_json_object(text) == '{"a": {"b": "}{"}, "c": "кавычка \\" и {"}'
+
+
+def test_extract_json_object_without_object():
+    assert _extract_json_object("нет JSON") is None
+    assert _extract_json_object('{"unterminated": 1') is None
+
+
+def test_extract_json_object_from_markdown_fence():
+    text = 'Результат:\n```json\n{"is_relevant": false, "summary": "a}b"}\n```'
+    assert _extract_json_object(text) == '{"is_relevant": false, "summary": "a}b"}'
+
+
+def test_check_relevance_batch_checks_repeated_articles_once(monkeypatch):
+    service = FilterService()
+    checked = []
+
+    def fake_check(article, flow_id, flowise_host):
+        checked.append(article["url"])
+        return {"is_relevant": True, "url": article["url"]}
+
+    monkeypatch.setattr(service, "check_relevance_with_flowise", fake_check)
+    articles = [
+        {"title": "Python 3.14", "summary": "Релиз", "url": "https://a.com/1"},
+        {"title": "Python 3.14!", "summary": "Релиз.", "url": "https://b.com/2"},
+        {"title": "Другой заголовок", "summary": "", "url": "https://a.com/1"},
+    ]
+
+    results = service.check_relevance_batch(articles, "flow", "http://flowise")
+
+    assert checked == ["https://a.com/1"]
+    assert [r["url"] for r in results] == [a["url"] for a in articles]
+
+
+def test_build_relevance_check_keeps_only_known_keys():
+    result = {"is_relevant": True, "interest_score": 8, "debug": "лишнее"}
+    check = FilterService()._build_relevance_check(result, {"url": "https://a.com"})
+    assert "debug" not in check
+    assert check["is_relevant"] is True
+    assert check["interest_score"] == 8
+    assert check["url"] == "https://a.com"
+    assert check["summary"] == ""
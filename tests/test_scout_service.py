@@ -0,0 +1,35 @@
+"""
+Тесты разбора RSS-лент в ScoutService.
+"""
+
+from requests.structures import CaseInsensitiveDict
+
+from apps.digest.services import scout_service
+from apps.digest.services.scout_service import ScoutService
+
+
+class _FakeResponse:
+    def __init__(self, content, headers):
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+
+    def raise_for_status(self):
+        pass
+
+
+def test_fetch_rss_headlines_uses_charset_from_headers(monkeypatch):
+    feed = (
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>Лента</title>'
+        "<item><title>Привет</title><link>https://example.com/a</link></item>"
+        "</channel></rss>"
+    ).encode("windows-1251")
+    response = _FakeResponse(
+        feed, {"Content-Type": "application/rss+xml; charset=windows-1251"}
+    )
+    monkeypatch.setattr(
+        scout_service.scout_session, "get", lambda *args, **kwargs: response
+    )
+
+    headlines = ScoutService().fetch_rss_headlines("https://example.com/rss")
+
+    assert headlines == [{"title": "Привет", "link": "https://example.com/a"}]